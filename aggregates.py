@@ -0,0 +1,78 @@
+import pandas as pd
+import profiling
+
+# Grain of the daily cube: one row per (date, player, drill, position)
+CUBE_KEYS = ['Session Date', 'Player Name', 'Drill Name', 'Position']
+
+# GPS metrics the reports aggregate
+CUBE_METRICS = ['Total Distance', 'Metres Per Minute', 'Maximum Speed', 'Explosive Distance', 'Session Time(mins)',
+                'High Speed Running']
+
+# Statistics stored per metric; means are rebuilt as sum / count
+CUBE_STATS = ['sum', 'count', 'max']
+
+
+def _column(metric, stat):
+    return f'{metric}|{stat}'
+
+
+# Build the cube once from the raw drill rows. Sums are accumulated in
+# float64 so rolling them up over long ranges does not lose precision;
+# the source dtypes are kept for the maxima, which roll-ups cast back to.
+def build_daily_cube(gps_df, metrics=CUBE_METRICS):
+    values = gps_df[CUBE_KEYS + metrics].astype({metric: 'float64' for metric in metrics})
+    cube = values.groupby(CUBE_KEYS, observed=True, dropna=False, sort=True)[metrics].agg(CUBE_STATS)
+    cube.columns = [_column(metric, stat) for metric, stat in cube.columns]
+    return finish_cube(cube.reset_index(), gps_df)
+
+
+# Sort a cube (freshly built, or concatenated from stored partitions) by date
+# and record the GPS dtypes that roll-ups cast maxima back to
+def finish_cube(cube, gps_df):
+    cube = cube.sort_values('Session Date', kind='mergesort').reset_index(drop=True)
+    metrics = sorted({column.split('|')[0] for column in cube.columns if '|' in column})
+    cube.attrs['dtypes'] = {metric: str(gps_df[metric].dtype) for metric in metrics}
+    return cube
+
+
+# Roll a (date-sliced) cube up to the `by` columns.
+# aggregations maps metric -> 'sum' | 'mean' | 'max', like DataFrame.groupby().agg({...}).
+# Sums and means stay float64 (season-long float32 totals drop whole metres);
+# maxima come back in the GPS dtype.
+@profiling.timed('aggregate')
+def rollup(cube, by, aggregations):
+    sums, maxima = [], []
+    for metric, how in aggregations.items():
+        if how == 'sum':
+            sums.append(_column(metric, 'sum'))
+        elif how == 'mean':
+            sums += [_column(metric, 'sum'), _column(metric, 'count')]
+        elif how == 'max':
+            maxima.append(_column(metric, 'max'))
+        else:
+            raise ValueError(f"Unsupported aggregation '{how}' for {metric}")
+
+    grouped = cube.groupby(by, observed=True, sort=True) if by else None
+    if grouped is None:
+        rolled = pd.DataFrame([{**cube[sums].sum().to_dict(), **cube[maxima].max().to_dict()}])
+    else:
+        rolled = pd.concat([grouped[sums].sum(), grouped[maxima].max()], axis=1)
+
+    dtypes = cube.attrs.get('dtypes', {})
+    result = pd.DataFrame(index=rolled.index)
+    for metric, how in aggregations.items():
+        if how == 'mean':
+            result[metric] = rolled[_column(metric, 'sum')] / rolled[_column(metric, 'count')]
+        elif how == 'max':
+            values = rolled[_column(metric, 'max')]
+            result[metric] = values.astype(dtypes.get(metric, values.dtype))
+        else:
+            result[metric] = rolled[_column(metric, 'sum')]
+    return result.reset_index() if by else result.iloc[0]
+
+
+# Mean per-session value of each metric for every match-day offset (MD-4 ... MD+2)
+# and the `by` columns, from a date-sliced player-day frame
+@profiling.timed('aggregate')
+def md_profile(player_days, metrics, by=()):
+    return player_days.groupby(list(by) + ['Day Rhythm'], observed=True, sort=True)[metrics].mean().reset_index()
@@ -1,20 +1,29 @@
+import importlib
 import streamlit as st
-from PIL import Image
-import home
-import team_report
-import player_report
-import injury_prediction
-import personalized_plan
-import pandas as pd
-
-# Load the logo
-logo = Image.open('Images/Logo.png')
-
-# Load the data
-calendar_df = pd.read_csv('data/calendar_preprocessed.csv')
-gps_df = pd.read_csv('data/gps_data_preprocessed.csv')
-wellness_df = pd.read_csv('data/wellness_preprocessed.csv')
-roster_df = pd.read_csv('data/roster_preprocessed.csv')
+import assets
+import data_store
+import profiling
+
+# Page registry: menu label -> (icon, module, render function, sidebar filters it takes).
+# A page module is imported only when its page is first selected; importing it
+# renders nothing, the app calls its render function.
+PAGES = {
+    'Home': ('🏠', 'home', 'display_home', []),
+    'Team Report': ('👥', 'team_report', 'display_team_report', ['start_date', 'end_date']),
+    'Player Report': ('⚽', 'player_report', 'display_player_report', ['player_name', 'start_date', 'end_date']),
+    'Injury Prediction': ('🤕', 'injury_prediction', 'display_injury_prediction', ['start_date', 'end_date']),
+    'Personalized Plan': ('📝', 'personalized_plan', 'display_personalized_plan', []),
+}
+
+# ?diagnostics=1 turns on render profiling (and its sidebar panel) for this session
+if st.query_params.get('diagnostics') == '1':
+    st.session_state['diagnostics'] = True
+profiling.enable_session(st.session_state.get('diagnostics', False))
+
+# Load the data the sidebar filters need (shared, cached store)
+with profiling.page('Sidebar'):
+    gps_df = data_store.load_gps()
+    roster_df = data_store.load_roster()
 
 # Add custom CSS for styling
 st.markdown(
@@ -77,22 +86,13 @@ st.markdown(
 
 # Add Title and Sidebar Image
 st.markdown('<div class="title">Real Madrid Club de Fútbol</div>', unsafe_allow_html=True)
-st.sidebar.image(logo, use_container_width=True)
-
-# Define the icons for each menu option
-icons = {
-    'Home': '🏠',
-    'Team Report': '👥',
-    'Player Report': '⚽',
-    'Injury Prediction': '🤕',
-    'Personalized Plan': '📝'
-}
+st.sidebar.image(assets.image_bytes('Images/Logo.png'), use_container_width=True)
 
 # Sidebar Menu (Move this block after the date range and player selection)
 menu = st.sidebar.selectbox(
     'Choose an option:',
-    ('Home', 'Team Report', 'Player Report', 'Injury Prediction', 'Personalized Plan'),
-    format_func=lambda x: f"{icons[x]} {x}",  # Add icon to the option label
+    tuple(PAGES),
+    format_func=lambda x: f"{PAGES[x][0]} {x}",  # Add icon to the option label
     index=1  # Set default to Team Report for initial selection
 )
 
@@ -113,17 +113,14 @@ start_date, end_date = selected_date_range
 
 
 
-# Display content based on menu selection
-if menu == 'Home':
-    home.display_home()
-elif menu == 'Team Report':
-    team_report.display_team_report(start_date=start_date, end_date=end_date)  # Pass start and end dates separately
-elif menu == 'Player Report':
-    player_report.display_player_report(player_name=player_name, start_date=start_date, end_date=end_date)  # Pass start and end dates separately
-elif menu == 'Injury Prediction':
-    injury_prediction.display_injury_prediction()
-elif menu == 'Personalized Plan':
-    personalized_plan.display_personalized_plan()
+# Display content based on menu selection: import the selected page on demand
+# and pass it the sidebar filters it takes
+_, module_name, function_name, filters = PAGES[menu]
+page = importlib.import_module(module_name)
+filter_values = {'player_name': player_name, 'start_date': start_date, 'end_date': end_date}
+with profiling.page(menu):
+    getattr(page, function_name)(**{name: filter_values[name] for name in filters})
+profiling.display_diagnostics()
 
 # Sidebar active state styling
 if menu == 'Home':
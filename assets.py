@@ -0,0 +1,31 @@
+import io
+from PIL import Image
+import streamlit as st
+
+# Widest image st.image serves as-is; anything wider is resized by Streamlit on every call
+MAX_DISPLAY_WIDTH = 1460
+
+
+# Decode, resize and encode an image once per process and hand out the bytes.
+# st.image passes JPEG/PNG bytes up to MAX_DISPLAY_WIDTH wide straight through,
+# so no session decodes or re-encodes the source image again.
+# width/height default to the source size (like image.resize((image.width, 400))).
+@st.cache_resource
+def image_bytes(path, width=None, height=None):
+    image = Image.open(path)
+    width, height = width or image.width, height or image.height
+    if width > MAX_DISPLAY_WIDTH:
+        width, height = MAX_DISPLAY_WIDTH, round(height * MAX_DISPLAY_WIDTH / width)
+
+    # Already at the displayed size and in a format Streamlit serves: use the file as is
+    if (width, height) == image.size and image.format in ('JPEG', 'PNG'):
+        with open(path, 'rb') as image_file:
+            return image_file.read()
+
+    image = image.resize((width, height), Image.LANCZOS)
+    buffer = io.BytesIO()
+    if image.mode in ('RGBA', 'LA', 'P'):
+        image.save(buffer, format='PNG', optimize=True)
+    else:
+        image.convert('RGB').save(buffer, format='JPEG', quality=85, optimize=True)
+    return buffer.getvalue()
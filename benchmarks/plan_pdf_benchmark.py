@@ -0,0 +1,68 @@
+import argparse
+import os
+import sys
+import time
+
+# Usage: python benchmarks/plan_pdf_benchmark.py [--plans 100]
+#
+# Renders a batch of LLM-style plans with plan_pdf.generate_pdf and reports
+# the first (cold: font registration, styles, page templates) and the warm
+# milliseconds per document.
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import plan_pdf  # noqa: E402
+
+SAMPLE_PLAN = """*** Here is your personalized performance, recovery, and nutrition plan: ***
+
+🏋️ **Training Plan**
+- **Focus Areas**: Stamina and repeated high-speed running, since total distance is above the squad average but sprint count has dropped over the last week and soreness is trending up.
+- **Exercise Recommendations**:
+  - Tempo runs: 6 x 200 m at 75% max speed, 60 s rest
+  - Nordic hamstring curls: 3 sets x 6 reps, slow eccentric
+  - Box jumps: 4 sets x 5 reps, full recovery between sets
+  - Copenhagen planks: 3 x 30 s each side
+- **Weekly Training Hours**: 8-9 hours/week
+- **Performance Goals**: Improve high-speed running by 10% over four weeks
+
+🛌 **Recovery Plan**
+- **Rest Days**: 2 days/week
+- **Recovery Techniques**: Massage after MD, cold-water immersion (10-12 °C, 10 min), active recovery on MD+1
+- **Sleep Recommendations**: 8-9 hours, consistent bedtime, no screens 60 minutes before sleep
+- **Additional Restorative Practices**: Mobility work and breathing exercises
+
+🍽️ **Diet Plan**
+- **Daily Caloric Intake**: 3200 kcal/day
+- **Macronutrient Breakdown**: 55% Carbs / 25% Protein / 20% Fat
+- **Hydration**: 3.5 liters of water/day plus electrolytes on double sessions
+- **Sample Meals**:
+    - Breakfast: Oats with berries, Greek yoghurt and honey
+    - Lunch: Chicken, rice and vegetables
+    - Dinner: Salmon, sweet potato and salad
+    - Snacks: Banana and peanut butter, protein shake after training
+"""
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark plan PDF rendering.')
+    parser.add_argument('--plans', type=int, default=100)
+    args = parser.parse_args()
+
+    timings = []
+    total_bytes = 0
+    for i in range(args.plans):
+        started = time.perf_counter()
+        pdf = plan_pdf.generate_pdf(SAMPLE_PLAN, title=f"Player {i + 1} - Personalized Plan")
+        timings.append(time.perf_counter() - started)
+        total_bytes += len(pdf.getvalue())
+
+    warm = timings[1:] or timings
+    print(f"{args.plans} plans rendered in {sum(timings):.2f}s")
+    print(f"first document: {timings[0] * 1000:.1f} ms")
+    print(f"warm: {sum(warm) / len(warm) * 1000:.1f} ms per document "
+          f"(min {min(warm) * 1000:.1f}, max {max(warm) * 1000:.1f})")
+    print(f"average size: {total_bytes / args.plans / 1024:.1f} KiB")
+
+
+if __name__ == '__main__':
+    main()
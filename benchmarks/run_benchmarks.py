@@ -0,0 +1,188 @@
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+import warnings
+
+# Usage:
+#   python benchmarks/run_benchmarks.py                        # 10x, 100x and 1000x the real data
+#   python benchmarks/run_benchmarks.py --scales 10 100 --repeat 5 --only workload
+#   python benchmarks/run_benchmarks.py --json after.json --compare before.json
+#
+# Runs the report aggregations, the preprocessing functions, the workload
+# computation and injury scoring headlessly on synthetic datasets
+# (synthetic_data.py) and prints the median milliseconds per case and scale.
+# --json saves the results; --compare reads a saved run and shows the ratio to
+# it, marking cases that got more than REGRESSION_RATIO slower.
+# (Plan PDF rendering does not depend on the data size: plan_pdf_benchmark.py.)
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import aggregates  # noqa: E402
+import chart_sampling  # noqa: E402
+import data_store  # noqa: E402
+import injury_model  # noqa: E402
+import preprocessing  # noqa: E402
+import reports  # noqa: E402
+import synthetic_data  # noqa: E402
+import workload  # noqa: E402
+
+REGRESSION_RATIO = 1.2
+
+# convert_date_columns tries every text column as dates; the names warn on each run
+warnings.filterwarnings('ignore', message='Could not infer format')
+
+
+# The frames the pages work on, built the way data_store's loaders build them
+def load_frames(frames):
+    calendar = data_store.apply_schema(frames['calendar'], ['Date'])
+    roster = data_store.apply_schema(frames['roster'], ['DOB'])
+    gps = data_store.apply_schema(frames['gps'], ['Session Date'])
+    gps = data_store.sort_by_date(data_store.add_calendar_columns(data_store.add_derived_gps_columns(gps, roster),
+                                                                  calendar))
+    wellness = data_store.apply_schema(frames['wellness'], ['Session Date'])
+    wellness = data_store.sort_by_date(data_store.add_calendar_columns(wellness, calendar))
+    cube = aggregates.build_daily_cube(gps)
+    player_days = data_store.add_calendar_columns(
+        aggregates.rollup(cube, ['Session Date', 'Player Name'], data_store.PLAYER_DAY_METRICS), calendar)
+    workload_frames = {method: workload.compute_workload(gps, method) for method in workload.METHODS}
+    workload_df = workload_frames[injury_model.WORKLOAD_METHOD]
+    report_frames = {
+        'gps_cube': cube, 'player_days': player_days, 'roster': roster, 'workload': workload_frames,
+        'gps_by_player': data_store.sort_by_date(gps, by_player=True),
+        'wellness_by_player': data_store.sort_by_date(wellness, by_player=True),
+    }
+    return {
+        **report_frames, 'raw': frames, 'calendar': calendar, 'gps': gps, 'wellness': wellness, 'cube': cube,
+        'workload': workload_df, 'report_frames': report_frames,
+        'features': injury_model.build_feature_frame(gps, wellness, workload_df),
+        'model': injury_model.load_model(),
+        'start': gps['Session Date'].min(), 'end': gps['Session Date'].max(),
+        'player': str(frames['roster']['Player Name'].iloc[0]),
+    }
+
+
+def _player_report(data):
+    gps = data_store.player_date_slice(data['gps_by_player'], data['player'], data['start'], data['end'])
+    wellness = data_store.player_date_slice(data['wellness_by_player'], data['player'], data['start'], data['end'])
+    return reports.player_summary(gps, wellness, data['roster'], data['player'])
+
+
+def _team_report(data):
+    return reports.team_summary(data_store.date_slice(data['cube'], data['start'], data['end']))
+
+
+def _wellness_text_dates(data):
+    wellness = data['raw']['wellness']
+    return wellness.assign(**{'Session Date': wellness['Session Date'].dt.strftime('%Y-%m-%d')})
+
+
+# name -> (setup(data) -> argument, case(argument)); setup is not timed
+CASES = {
+    'preprocessing.clean_data': (lambda data: data['raw']['gps'], preprocessing.clean_data),
+    'preprocessing.convert_date_columns': (_wellness_text_dates, preprocessing.convert_date_columns),
+    'preprocessing.filter_outliers': (
+        lambda data: data['raw']['gps'],
+        lambda gps: preprocessing.filter_outliers(gps, preprocessing.GPS_OUTLIER_COLUMNS)),
+    'data_store.apply_schema': (
+        lambda data: data['raw']['gps'], lambda gps: data_store.apply_schema(gps, ['Session Date'])),
+    'aggregates.build_daily_cube': (lambda data: data['gps'], aggregates.build_daily_cube),
+    'reports.team_summary': (lambda data: data, _team_report),
+    'aggregates.md_profile': (
+        lambda data: data['player_days'],
+        lambda player_days: aggregates.md_profile(player_days, list(data_store.PLAYER_DAY_METRICS), by=['Player Name'])),
+    'reports.player_summary': (lambda data: data, _player_report),
+    'reports.team_report': (
+        lambda data: data, lambda data: reports.team_report(data['report_frames'], data['start'], data['end'])),
+    'reports.player_report': (
+        lambda data: data,
+        lambda data: reports.player_report(data['report_frames'], data['player'], data['start'], data['end'])),
+    'workload.compute_workload[rolling]': (
+        lambda data: data['gps'], lambda gps: workload.compute_workload(gps, 'rolling')),
+    'workload.compute_workload[ewma]': (lambda data: data['gps'], lambda gps: workload.compute_workload(gps, 'ewma')),
+    'injury_model.build_feature_frame': (
+        lambda data: data,
+        lambda data: injury_model.build_feature_frame(data['gps'], data['wellness'], data['workload'])),
+    'injury_model.predict_risk': (
+        lambda data: data, lambda data: injury_model.predict_risk(data['model'], data['features'])),
+    'chart_sampling.scatter': (
+        lambda data: data['gps'],
+        lambda gps: chart_sampling.scatter(gps, 'Metres Per Minute', 'Total Distance', 'Drill Name').to_json()),
+    'chart_sampling.box': (
+        lambda data: data['gps'], lambda gps: chart_sampling.box(gps, 'Player Name', 'Total Distance').to_json()),
+}
+
+
+# Median and best milliseconds of `repeat` calls, after one untimed warm-up call
+def measure(case, argument, repeat):
+    case(argument)
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        case(argument)
+        timings.append((time.perf_counter() - started) * 1000)
+    return {'median_ms': statistics.median(timings), 'best_ms': min(timings)}
+
+
+def run(scales, repeat, only=None, seed=0):
+    results = {}
+    for scale in scales:
+        started = time.perf_counter()
+        data = load_frames(synthetic_data.generate_scale(scale, seed))
+        print(f"{scale}x: {len(data['gps']):,} GPS rows, {len(data['wellness']):,} wellness rows "
+              f"(generated and loaded in {time.perf_counter() - started:.1f}s)", file=sys.stderr)
+        for name, (setup, case) in CASES.items():
+            if only and not any(pattern in name for pattern in only):
+                continue
+            results.setdefault(name, {})[str(scale)] = measure(case, setup(data), repeat)
+    return results
+
+
+def report(results, scales, baseline=None):
+    header = f"{'case':<38}" + ''.join(f"{f'{scale}x ms':>12}" for scale in scales)
+    if baseline:
+        header += ''.join(f"{f'{scale}x vs base':>14}" for scale in scales)
+    lines = [header]
+    for name, by_scale in results.items():
+        line = f"{name:<38}" + ''.join(f"{by_scale[str(scale)]['median_ms']:>12.1f}" for scale in scales)
+        if baseline:
+            for scale in scales:
+                base = baseline.get(name, {}).get(str(scale))
+                if base is None:
+                    line += f"{'-':>14}"
+                    continue
+                ratio = by_scale[str(scale)]['median_ms'] / base['median_ms']
+                line += f"{f'{ratio:.2f}x' + (' !' if ratio > REGRESSION_RATIO else ''):>14}"
+        lines.append(line)
+    return '\n'.join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the data paths on synthetic data at several scales.')
+    parser.add_argument('--scales', type=int, nargs='+', default=sorted(synthetic_data.SCALES),
+                        choices=sorted(synthetic_data.SCALES))
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--only', nargs='+', help='Run the cases whose name contains any of these.')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--json', help='Save the results to this file.')
+    parser.add_argument('--compare', help='Results file of an earlier run to compare against.')
+    args = parser.parse_args()
+
+    results = run(args.scales, args.repeat, args.only, args.seed)
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as baseline_file:
+            baseline = json.load(baseline_file)['results']
+    print(report(results, args.scales, baseline))
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as results_file:
+            json.dump({'scales': args.scales, 'repeat': args.repeat, 'seed': args.seed, 'results': results},
+                      results_file, indent=2)
+
+
+if __name__ == '__main__':
+    main()
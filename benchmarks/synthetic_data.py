@@ -0,0 +1,188 @@
+import argparse
+import os
+import sys
+import numpy as np
+import pandas as pd
+
+# Usage:
+#   python benchmarks/synthetic_data.py --scale 100 --output data_synthetic
+#   python benchmarks/synthetic_data.py --players 30 --seasons 3 --drills-per-day 4 --output data_synthetic
+#
+# Synthesizes calendar, roster, GPS and wellness frames with the columns of the
+# data/*_preprocessed.csv files. Seasons are 40 weeks of the real match-day
+# cycle (MD-4 ... MD+2); every training day is a session with a few drills.
+# GPS rows are real drill rows of the same drill, resampled with +-20% noise,
+# so the metrics keep their ranges and correlations. Wellness answers drift
+# per player and dip after match days.
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import data_store  # noqa: E402
+
+SEASON_WEEKS = 40
+FIRST_SEASON_START = pd.Timestamp('2022-08-29')  # a Monday, MD+2 in the real calendar
+MD_CYCLE = ['MD+2', 'MD-4', 'MD-3', 'MD-2', 'MD-1', 'MD', 'MD+1']
+
+# Share of training days with a GPS session, and of a session's drills a player takes part in
+SESSION_RATE = 0.85
+DRILL_PARTICIPATION = 0.9
+
+# The real dataset has about 456 GPS rows; these presets give roughly 10x, 100x
+# and 1000x that many
+REAL_GPS_ROWS = 456
+SCALES = {
+    10: {'players': 25, 'seasons': 1, 'drills_per_day': 1},
+    100: {'players': 25, 'seasons': 2, 'drills_per_day': 5},
+    1000: {'players': 40, 'seasons': 12, 'drills_per_day': 5},
+}
+
+POSITIONS = ['Defender', 'Midfielder', 'Forward']
+WELLNESS_ITEMS = ['Energy', 'Sleep Quality', 'Stress', 'Soreness']
+
+
+def _read_template(name):
+    file_name, date_columns = data_store.DATASETS[name]
+    return pd.read_csv(os.path.join(data_store.DATA_DIR, file_name), parse_dates=date_columns)
+
+
+def make_calendar(seasons):
+    dates = pd.date_range(FIRST_SEASON_START, periods=seasons * 52 * 7, freq='D')
+    season_index = (dates - FIRST_SEASON_START).days // (52 * 7)
+    season_day = (dates - FIRST_SEASON_START).days % (52 * 7)
+    in_season = season_day < SEASON_WEEKS * 7
+    dates, season_index, season_day = dates[in_season], season_index[in_season], season_day[in_season]
+    day_rhythm = np.array(MD_CYCLE)[season_day % 7]
+    first_year = FIRST_SEASON_START.year + season_index
+    return pd.DataFrame({
+        'Date': dates,
+        'Day Number': dates.day.astype('float64'),
+        'Day': dates.day_name(),
+        'Month': dates.strftime('%b'),
+        'Month Name': dates.month_name(),
+        'Month Number': dates.month.astype('float64'),
+        'Year': dates.year.astype('float64'),
+        'Season': [f'{year}/{(year + 1) % 100:02d}' for year in first_year],
+        'week of Season': (season_day // 7 + 1).astype('float64'),
+        'Day Rhythm': day_rhythm,
+        'Activity': np.where(day_rhythm == 'MD', 'Game', 'Training'),
+    })
+
+
+# The real roster first, then generated players cycling through the positions
+def make_roster(players, rng):
+    roster = _read_template('roster').head(players)
+    extra = players - len(roster)
+    if extra <= 0:
+        return roster.reset_index(drop=True)
+    template = roster.iloc[rng.integers(0, len(roster), extra)].reset_index(drop=True)
+    generated = template.assign(**{
+        'Player Name': [f'Player {len(roster) + i + 1}' for i in range(extra)],
+        'DOB': pd.Timestamp('1990-01-01') + pd.to_timedelta(rng.integers(0, 12 * 365, extra), unit='D'),
+        'Positional Number': [f'#{len(roster) + i + 1}' for i in range(extra)],
+        'Position': [POSITIONS[i % len(POSITIONS)] for i in range(extra)],
+        'Max Game Total Distance': rng.integers(9500, 13500, extra),
+        'Max Game High Speed Running': rng.integers(500, 1400, extra),
+    })
+    return pd.concat([roster, generated], ignore_index=True)
+
+
+def make_gps(calendar, roster, drills_per_day, rng):
+    template = _read_template('gps')
+    metric_columns = [column for column in template.columns
+                      if column not in ('Player Name', 'Session Date', 'Drill Name')]
+    drills = template['Drill Name'].unique()
+
+    training_days = calendar.loc[calendar['Activity'] == 'Training', 'Date']
+    session_dates = training_days[rng.random(len(training_days)) < SESSION_RATE].to_numpy()
+
+    # Every (session, drill slot, player) combination, then drop the drills a player sat out
+    players = roster['Player Name'].to_numpy()
+    session_drills = rng.choice(drills, size=(len(session_dates), drills_per_day))
+    grid = np.stack(np.meshgrid(np.arange(len(session_dates)), np.arange(drills_per_day), np.arange(len(players)),
+                                indexing='ij'), axis=-1).reshape(-1, 3)
+    grid = grid[rng.random(len(grid)) < DRILL_PARTICIPATION]
+    drill_names = session_drills[grid[:, 0], grid[:, 1]]
+
+    # Resample a real row of the same drill for every generated row
+    rows_by_drill = template.groupby('Drill Name').indices
+    source_rows = np.empty(len(grid), dtype='int64')
+    for drill in drills:
+        mask = drill_names == drill
+        source_rows[mask] = rng.choice(rows_by_drill[drill], mask.sum())
+
+    metrics = template[metric_columns].to_numpy(dtype='float64')[source_rows]
+    metrics *= rng.uniform(0.8, 1.2, size=(len(grid), 1))
+    gps = pd.DataFrame(metrics, columns=metric_columns)
+    for column in metric_columns:
+        if pd.api.types.is_integer_dtype(template[column]):
+            gps[column] = gps[column].round().astype(template[column].dtype)
+        else:
+            gps[column] = gps[column].round(2)
+    gps.insert(0, 'Player Name', players[grid[:, 2]])
+    gps.insert(1, 'Session Date', session_dates[grid[:, 0]])
+    gps.insert(2, 'Drill Name', drill_names)
+    return gps.sort_values(['Session Date', 'Player Name'], kind='mergesort').reset_index(drop=True)
+
+
+def make_wellness(calendar, roster, gps, rng):
+    days = gps[['Session Date', 'Player Name']].drop_duplicates().reset_index(drop=True)
+    baseline = pd.Series(rng.uniform(6, 9, len(roster)), index=roster['Player Name'])
+    day_rhythm = days['Session Date'].map(calendar.set_index('Date')['Day Rhythm'])
+    after_match = day_rhythm.isin(['MD+1', 'MD+2']).to_numpy() * 1.5
+
+    wellness = days.copy()
+    for item in WELLNESS_ITEMS:
+        scores = baseline.reindex(days['Player Name']).to_numpy() - after_match + rng.normal(0, 1.2, len(days))
+        wellness[item] = np.clip(np.rint(scores), 1, 10).astype('int64')
+    wellness['Total Score'] = wellness[WELLNESS_ITEMS].sum(axis=1)
+    return wellness
+
+
+# The four frames of a synthetic dataset, as read from the preprocessed CSVs
+def generate(players=22, seasons=1, drills_per_day=3, seed=0):
+    rng = np.random.default_rng(seed)
+    calendar = make_calendar(seasons)
+    roster = make_roster(players, rng)
+    gps = make_gps(calendar, roster, drills_per_day, rng)
+    wellness = make_wellness(calendar, roster, gps, rng)
+    return {'calendar': calendar, 'roster': roster, 'gps': gps, 'wellness': wellness}
+
+
+def generate_scale(scale, seed=0):
+    return generate(**SCALES[scale], seed=seed)
+
+
+# Write the frames under the preprocessed CSV names into a data directory
+def write(frames, directory):
+    os.makedirs(directory, exist_ok=True)
+    paths = []
+    for name, df in frames.items():
+        path = os.path.join(directory, data_store.DATASETS[name][0])
+        df.to_csv(path, index=False, date_format='%Y-%m-%d')
+        paths.append(path)
+    return paths
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Generate a synthetic multi-season dataset.')
+    parser.add_argument('--scale', type=int, choices=sorted(SCALES),
+                        help='Preset of about this many times the real GPS rows.')
+    parser.add_argument('--players', type=int, default=22)
+    parser.add_argument('--seasons', type=int, default=1)
+    parser.add_argument('--drills-per-day', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', default='data_synthetic')
+    args = parser.parse_args()
+
+    if args.scale:
+        frames = generate_scale(args.scale, args.seed)
+    else:
+        frames = generate(args.players, args.seasons, args.drills_per_day, args.seed)
+    for path in write(frames, args.output):
+        print(path)
+    print(f"{len(frames['gps']):,} GPS rows ({len(frames['gps']) / REAL_GPS_ROWS:.0f}x the real data), "
+          f"{len(frames['wellness']):,} wellness rows")
+
+
+if __name__ == '__main__':
+    main()
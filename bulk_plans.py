@@ -0,0 +1,243 @@
+import argparse
+import asyncio
+import io
+import os
+import threading
+import time
+import zipfile
+import pandas as pd
+from openai import AsyncOpenAI
+import plan_cache
+import plan_generator
+from plan_pdf import generate_pdf
+
+# Usage:
+#   python bulk_plans.py --output squad_plans.zip
+#   OPENAI_BASE_URL=http://127.0.0.1:8001/v1 OPENAI_API_KEY=stub python bulk_plans.py   (against stub_llm_server.py)
+#
+# Builds every roster player's plan inputs from the data files (latest wellness
+# answers, GPS sessions of the last week), generates the plans concurrently and
+# writes one PDF per player into a zip.
+
+# GPS session days averaged into each player's session inputs
+RECENT_GPS_DAYS = 7
+
+# At most CONCURRENCY requests in flight, started no faster than REQUESTS_PER_MINUTE
+CONCURRENCY = 5
+REQUESTS_PER_MINUTE = 60
+
+GPS_SESSION_COLUMNS = ['Total Distance', 'High Speed Running', 'Session Time(mins)', 'Number of Sprints']
+
+
+# Plan inputs per roster player as of a date (the latest data by default).
+# Weight and height are not in the data files, so they are left out of the prompt.
+def squad_player_data(wellness_df, gps_df, roster_df, as_of=None, days=RECENT_GPS_DAYS):
+    if as_of is None:
+        as_of = max(wellness_df['Session Date'].max(), gps_df['Session Date'].max())
+    as_of = pd.Timestamp(as_of).normalize()
+
+    wellness = wellness_df[wellness_df['Session Date'] <= as_of].sort_values('Session Date', kind='mergesort')
+    latest_wellness = wellness.groupby('Player Name', observed=True).tail(1).set_index('Player Name')
+
+    recent_gps = gps_df[(gps_df['Session Date'] > as_of - pd.Timedelta(days=days)) & (gps_df['Session Date'] <= as_of)]
+    sessions = recent_gps.groupby(['Player Name', 'Session Date'], observed=True)[GPS_SESSION_COLUMNS].sum()
+    per_session = sessions.groupby(level='Player Name', observed=True).mean()
+
+    squad_data = {}
+    for player_name in roster_df['Player Name']:
+        wellness_row = latest_wellness.loc[player_name] if player_name in latest_wellness.index else None
+        gps_row = per_session.loc[player_name] if player_name in per_session.index else None
+        if wellness_row is None and gps_row is None:
+            continue
+        squad_data[player_name] = {
+            "energy": None if wellness_row is None else int(wellness_row['Energy']),
+            "sleep_quality": None if wellness_row is None else int(wellness_row['Sleep Quality']),
+            "stress": None if wellness_row is None else int(wellness_row['Stress']),
+            "soreness": None if wellness_row is None else int(wellness_row['Soreness']),
+            "total_distance": None if gps_row is None else round(float(gps_row['Total Distance']) / 1000, 2),
+            "high_speed_running": None if gps_row is None else round(float(gps_row['High Speed Running']) / 1000, 2),
+            "minutes_per_session": None if gps_row is None else round(float(gps_row['Session Time(mins)'])),
+            "num_sprints": None if gps_row is None else round(float(gps_row['Number of Sprints']), 1),
+            "weight": None,
+            "height": None,
+            "bmi": None,
+        }
+    return squad_data
+
+
+# Spaces request starts at least 60 / requests_per_minute seconds apart
+class RateLimiter:
+    def __init__(self, requests_per_minute):
+        self.interval = 60 / requests_per_minute
+        self._next_start = 0.0
+        self._lock = asyncio.Lock()
+
+    async def wait(self):
+        async with self._lock:
+            now = time.monotonic()
+            delay = self._next_start - now
+            self._next_start = max(now, self._next_start) + self.interval
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+# One player's plan: from the plan cache when the same inputs were seen before,
+# otherwise one completion request. Returns (player, plan, from_cache, error);
+# a failed request, an empty reply or a plan cache error only fails this player.
+async def _generate_plan(client, semaphore, limiter, player_name, player_data, timeout):
+    key = plan_cache.plan_key(player_data, plan_generator.PROMPT_VERSION, plan_generator.MODEL)
+    try:
+        cached_plan = await asyncio.to_thread(plan_cache.get_plan, key)
+        if cached_plan is not None:
+            return player_name, cached_plan, True, None
+
+        async with semaphore:
+            await limiter.wait()
+            completion = await asyncio.wait_for(client.chat.completions.create(
+                model=plan_generator.MODEL, messages=plan_generator.build_messages(player_data)), timeout)
+        plan = completion.choices[0].message.content
+        if not plan:
+            raise ValueError("The model returned an empty plan.")
+        await asyncio.to_thread(plan_cache.put_plan, key, plan)
+    except Exception as error:
+        return player_name, None, False, error
+    return player_name, plan, False, None
+
+
+async def generate_squad_plans(squad_data, client=None, concurrency=CONCURRENCY,
+                               requests_per_minute=REQUESTS_PER_MINUTE, timeout=plan_generator.PLAN_TIMEOUT,
+                               on_progress=None):
+    if client is None:
+        client = AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"), base_url=os.getenv("OPENAI_BASE_URL"))
+    semaphore = asyncio.Semaphore(concurrency)
+    limiter = RateLimiter(requests_per_minute)
+    tasks = [_generate_plan(client, semaphore, limiter, player_name, player_data, timeout)
+             for player_name, player_data in squad_data.items()]
+
+    results = []
+    for task in asyncio.as_completed(tasks):
+        results.append(await task)
+        if on_progress is not None:
+            on_progress(len(results), len(tasks))
+    order = list(squad_data)
+    return sorted(results, key=lambda result: order.index(result[0]))
+
+
+def run_squad_plans(squad_data, **kwargs):
+    return asyncio.run(generate_squad_plans(squad_data, **kwargs))
+
+
+# The squad batch (and its zip) generated on a background thread, so the page
+# can poll its progress and cancel it. Plans finished before a cancel stay in
+# the plan cache, so starting the batch again picks them up.
+class SquadPlansJob:
+    def __init__(self, squad_data, **kwargs):
+        self.started = time.monotonic()
+        self.total = len(squad_data)
+        self.completed = 0
+        self.results = None
+        self.zip_bytes = None
+        self.error = None
+        self._loop = None
+        self._task = None
+        self._cancelled = threading.Event()
+        self._finished = threading.Event()
+        self._thread = threading.Thread(target=self._run, args=(squad_data, kwargs), daemon=True)
+        self._thread.start()
+
+    def _run(self, squad_data, kwargs):
+        try:
+            asyncio.run(self._generate(squad_data, kwargs))
+            if not self.cancelled:
+                self.zip_bytes = plans_zip(self.results).getvalue()
+        except asyncio.CancelledError:
+            pass
+        except Exception as error:
+            self.error = error
+        finally:
+            self._finished.set()
+
+    async def _generate(self, squad_data, kwargs):
+        self._loop, self._task = asyncio.get_running_loop(), asyncio.current_task()
+        if self.cancelled:
+            return
+        self.results = await generate_squad_plans(squad_data, on_progress=self._progress, **kwargs)
+
+    def _progress(self, done, total):
+        self.completed = done
+
+    @property
+    def done(self):
+        return self._finished.is_set()
+
+    @property
+    def cancelled(self):
+        return self._cancelled.is_set()
+
+    @property
+    def elapsed(self):
+        return time.monotonic() - self.started
+
+    def cancel(self):
+        self._cancelled.set()
+        if self._loop is not None and not self.done:
+            try:
+                self._loop.call_soon_threadsafe(self._task.cancel)
+            except RuntimeError:  # the loop already closed
+                pass
+
+    # Block until the batch finishes (for scripts; the page polls instead)
+    def wait(self, timeout=None):
+        self._finished.wait(timeout)
+        return self.results
+
+
+# Zip with one PDF per generated plan and errors.txt listing the players that failed
+def plans_zip(results):
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_DEFLATED) as archive:
+        errors = []
+        for player_name, plan, _, error in results:
+            if error is not None:
+                errors.append(f"{player_name}: {error}")
+            else:
+                pdf = generate_pdf(plan, title=f"{player_name} - Personalized Plan")
+                archive.writestr(f"{player_name}.pdf", pdf.getvalue())
+        if errors:
+            archive.writestr('errors.txt', '\n'.join(errors) + '\n')
+    buffer.seek(0)
+    return buffer
+
+
+def main():
+    import data_store
+
+    parser = argparse.ArgumentParser(description='Generate personalized plans for the whole roster as a zip of PDFs.')
+    parser.add_argument('--output', default='squad_plans.zip')
+    parser.add_argument('--as-of', help='Use the data up to this date (YYYY-MM-DD); defaults to the latest.')
+    parser.add_argument('--concurrency', type=int, default=CONCURRENCY)
+    parser.add_argument('--requests-per-minute', type=int, default=REQUESTS_PER_MINUTE)
+    parser.add_argument('--timeout', type=float, default=plan_generator.PLAN_TIMEOUT)
+    args = parser.parse_args()
+
+    roster_df = data_store.read_dataset('roster')
+    gps_df = data_store.add_derived_gps_columns(data_store.read_dataset('gps'), roster_df)
+    squad_data = squad_player_data(data_store.read_dataset('wellness'), gps_df, roster_df, args.as_of)
+
+    started = time.perf_counter()
+    results = run_squad_plans(squad_data, concurrency=args.concurrency,
+                              requests_per_minute=args.requests_per_minute, timeout=args.timeout,
+                              on_progress=lambda done, total: print(f"\r{done}/{total} plans", end='', flush=True))
+    with open(args.output, 'wb') as output_file:
+        output_file.write(plans_zip(results).getvalue())
+
+    cached = sum(from_cache for _, _, from_cache, _ in results)
+    failed = [player_name for player_name, _, _, error in results if error is not None]
+    print(f"\n{len(results) - len(failed)} plans ({cached} from the plan cache) in "
+          f"{time.perf_counter() - started:.1f}s written to {args.output}")
+    if failed:
+        print(f"Failed: {', '.join(failed)}")
+
+
+if __name__ == '__main__':
+    main()
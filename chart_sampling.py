@@ -0,0 +1,90 @@
+import numpy as np
+import pandas as pd
+import plotly.express as px
+import plotly.graph_objects as go
+
+# Row-level charts (scatters and box plots over every drill row) for ranges that
+# can hold a season of data. Up to POINT_BUDGET rows are plotted as they are;
+# above it scatters plot a sample stratified on their colour column, drawn with
+# WebGL (scattergl), and box plots are drawn from precomputed quartiles and
+# whiskers, so the figure size stays flat as the data grows.
+POINT_BUDGET = 5000
+
+# Fixed seed: the same rows give the same sample (and the same cached figure)
+SAMPLE_SEED = 0
+
+
+# At most `budget` rows of df (exactly `budget` above it), split over the groups
+# of the `by` column by their share of the rows: every group first gets one row
+# (the largest groups only, when there are more groups than the budget), the
+# rest goes out by largest remainder. Rows keep their original order.
+def stratified_sample(df, by, budget=POINT_BUDGET, random_state=SAMPLE_SEED):
+    if len(df) <= budget:
+        return df
+    shuffled = df.iloc[np.random.default_rng(random_state).permutation(len(df))]
+    groups = shuffled.groupby(by, observed=True)
+    sizes = groups.size()
+    if len(sizes) >= budget:
+        quota = pd.Series(0, index=sizes.index)
+        quota[sizes.nlargest(budget).index] = 1
+    else:
+        share = (sizes - 1) * (budget - len(sizes)) / (len(df) - len(sizes))
+        quota = np.floor(share)
+        leftover = budget - len(sizes) - int(quota.sum())
+        quota[(share - quota).nlargest(leftover).index] += 1
+        quota += 1
+    keep = groups.cumcount().to_numpy() < quota.reindex(shuffled[by]).to_numpy(dtype='float64')
+    return shuffled[keep].sort_index()
+
+
+def _sampled_title(title, shown, total):
+    note = f"{shown:,} of {total:,} points"
+    return f"{title} ({note})" if title else note
+
+
+# px.scatter with a colour column; above the budget a stratified sample on
+# scattergl traces, with the sample size noted in the title
+def scatter(df, x, y, color, budget=POINT_BUDGET, title=None, **kwargs):
+    if len(df) <= budget:
+        return px.scatter(df, x=x, y=y, color=color, title=title, **kwargs)
+    sample = stratified_sample(df, color, budget)
+    return px.scatter(sample, x=x, y=y, color=color, render_mode='webgl',
+                      title=_sampled_title(title, len(sample), len(df)), **kwargs)
+
+
+# Quartiles, Tukey whiskers (the furthest values within 1.5 IQR of the box,
+# as Plotly draws them) and mean of y per x category
+def box_stats(df, x, y):
+    grouped = df.groupby(x, observed=True, sort=True)[y]
+    stats = grouped.quantile([0.25, 0.5, 0.75]).unstack()
+    stats.columns = ['q1', 'median', 'q3']
+    stats['mean'] = grouped.mean()
+    iqr = stats['q3'] - stats['q1']
+    values = df[[x, y]].join(stats[['q1', 'q3']].assign(iqr=iqr), on=x)
+    inside = values[(values[y] >= values['q1'] - 1.5 * values['iqr']) & (values[y] <= values['q3'] + 1.5 * values['iqr'])]
+    stats['lowerfence'] = inside.groupby(x, observed=True)[y].min()
+    stats['upperfence'] = inside.groupby(x, observed=True)[y].max()
+    outliers = values.loc[(values[y] < values['q1'] - 1.5 * values['iqr']) | (values[y] > values['q3'] + 1.5 * values['iqr']),
+                          [x, y]]
+    return stats.reset_index(), outliers
+
+
+# px.box over the raw rows; above the budget one precomputed box per category,
+# with the outliers (sampled down to the budget) as a scattergl trace
+def box(df, x, y, budget=POINT_BUDGET, title=None):
+    if len(df) <= budget:
+        return px.box(df, x=x, y=y, title=title)
+    stats, outliers = box_stats(df, x, y)
+    outliers = stratified_sample(outliers, x, budget)
+    categories = stats[x].astype(str)
+    fig = go.Figure([
+        go.Box(x=categories, q1=stats['q1'], median=stats['median'], q3=stats['q3'], mean=stats['mean'],
+               lowerfence=stats['lowerfence'], upperfence=stats['upperfence'], name=y, boxpoints=False,
+               marker_color=px.colors.qualitative.Plotly[0]),
+        go.Scattergl(x=outliers[x].astype(str), y=outliers[y], mode='markers', name='Outliers',
+                     marker=dict(color=px.colors.qualitative.Plotly[0], size=4)),
+    ])
+    fig.update_layout(title=title, xaxis_title=x, yaxis_title=y, showlegend=False)
+    fig.update_xaxes(categoryorder='array', categoryarray=list(categories))
+    return fig
+
@@ -0,0 +1,459 @@
+import logging
+import os
+import sys
+import tempfile
+import time
+import numpy as np
+import pandas as pd
+from pandas.api.types import union_categoricals
+import streamlit as st
+import aggregates
+import profiling
+import workload
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+logger = logging.getLogger(__name__)
+
+DATA_DIR = 'data'
+CACHE_DIR = os.path.join(DATA_DIR, 'cache')
+
+# Partitioned store written by ingest.py (one Parquet file per month)
+STORE_DIR = os.path.join(DATA_DIR, 'store')
+
+# Preprocessed CSV exports and the date columns each one carries
+DATASETS = {
+    'calendar': ('calendar_preprocessed.csv', ['Date']),
+    'gps': ('gps_data_preprocessed.csv', ['Session Date']),
+    'wellness': ('wellness_preprocessed.csv', ['Session Date']),
+    'roster': ('roster_preprocessed.csv', ['DOB']),
+}
+
+# Low-cardinality text columns that are stored as categoricals
+CATEGORICAL_COLUMNS = ['Player Name', 'Drill Name', 'Position']
+
+# Calendar columns attached to GPS and wellness rows at load
+CALENDAR_COLUMNS = ['Day Rhythm', 'Activity']
+
+# Player-day totals behind the match-day-cycle profiles
+PLAYER_DAY_METRICS = {
+    'Total Distance': 'sum',
+    'High Speed Running': 'sum',
+    'Explosive Distance': 'sum',
+    'Maximum Speed': 'max',
+}
+
+# Explicit dtypes for the GPS export: counts fit in int16, distances, speeds
+# and loads are float32.
+GPS_COUNT_COLUMNS = (
+    ['Number of Sprints', 'Number of Accelerations']
+    + [f'Accelerations Zone {zone}' for zone in range(1, 7)]
+    + ['Number of Decelerations']
+    + [f'Decelerations Zone {zone}' for zone in range(1, 7)]
+)
+GPS_DTYPES = {
+    'Player Name': 'category',
+    'Drill Name': 'category',
+    'Session Time(mins)': 'float32',
+    'Total Distance': 'float32',
+    'Metres Per Minute': 'float32',
+    **{f'Distance Zone {zone}': 'float32' for zone in range(1, 7)},
+    'HSR per min': 'float32',
+    'Average Speed': 'float32',
+    'Maximum Speed': 'float32',
+    **{column: 'int16' for column in GPS_COUNT_COLUMNS},
+    'HML Distance': 'float32',
+    'HML Distance Per Minute': 'float32',
+    'Average Step Impact Left (g)': 'float32',
+    'Average Step Impact Right (g)': 'float32',
+    'Step Balance': 'float32',
+    'HML Efforts': 'float32',
+    'Explosive Distance': 'float32',
+}
+
+# Cached frames are shared between sessions, so edits must copy instead of
+# writing through. pandas >= 3 always behaves this way.
+if int(pd.__version__.split('.')[0]) < 3:
+    pd.set_option('mode.copy_on_write', True)
+
+
+# (Re)build the categoricals; frames concatenated from several files come back
+# as plain strings when their categories differ
+def categorize(df):
+    df = df.copy()
+    for column in CATEGORICAL_COLUMNS:
+        if column in df.columns:
+            df[column] = df[column].astype(object).astype('category')
+    return df
+
+
+# Apply the typed schema: parsed dates, categoricals for names and float32 metrics
+def apply_schema(df, date_columns):
+    df = categorize(df)
+    for column in date_columns:
+        df[column] = pd.to_datetime(df[column])
+    numeric_columns = df.select_dtypes(include='number').columns
+    df = df.astype({column: GPS_DTYPES.get(column, 'float32') for column in numeric_columns})
+    return df
+
+
+def _csv_path(name):
+    return os.path.join(DATA_DIR, DATASETS[name][0])
+
+
+# Bump when apply_schema or the dtypes change so stale Parquet copies are not reused
+SCHEMA_VERSION = 2
+
+
+def _parquet_path(name):
+    return os.path.join(CACHE_DIR, f'{os.path.splitext(DATASETS[name][0])[0]}.v{SCHEMA_VERSION}.parquet')
+
+
+# Write the typed frame next to the CSVs so later processes skip text parsing.
+# Parquet needs pyarrow (or fastparquet); without it we silently stay on CSV.
+# Each writer fills its own temporary file and moves it into place, so a
+# concurrent cold start never reads a half-written copy.
+def _write_parquet(df, name):
+    temp_path = None
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        temp_fd, temp_path = tempfile.mkstemp(suffix='.tmp', dir=CACHE_DIR)
+        os.close(temp_fd)
+        df.to_parquet(temp_path, index=False)
+        os.replace(temp_path, _parquet_path(name))
+    except (ImportError, OSError, ValueError):
+        if temp_path is not None and os.path.exists(temp_path):
+            os.remove(temp_path)
+        return False
+    return True
+
+
+# Peak resident set size of this process in MB (not available on Windows)
+def peak_rss_mb():
+    if resource is None:
+        return float('nan')
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 2**20 if sys.platform == 'darwin' else peak / 2**10
+
+
+# Read a raw GPS export chunk by chunk with the explicit schema, so no chunk is
+# ever materialised as int64/float64/object columns. `columns` limits the read
+# to what the caller needs. Logs rows/sec and the process's peak RSS.
+def read_gps_export(path, columns=None, chunksize=100_000):
+    # Session Date is read as a categorical and each distinct date is parsed once at the end
+    dtypes = {column: dtype for column, dtype in {**GPS_DTYPES, 'Session Date': 'category'}.items()
+              if columns is None or column in columns}
+
+    started = time.perf_counter()
+
+    try:
+        chunks = list(pd.read_csv(path, usecols=columns, dtype=dtypes, chunksize=chunksize))
+    except ValueError:
+        # A blank or fractional count cannot be stored as int16; keep such files readable
+        logger.warning("%s has missing or non-integer counts; reading them as float32", path)
+        dtypes = {column: 'float32' if dtype == 'int16' else dtype for column, dtype in dtypes.items()}
+        chunks = list(pd.read_csv(path, usecols=columns, dtype=dtypes, chunksize=chunksize))
+
+    if not chunks:
+        df = pd.read_csv(path, usecols=columns, dtype=dtypes)
+    else:
+        # Every chunk has its own categories; union them instead of falling back to object columns
+        df = pd.DataFrame({
+            column: pd.Categorical(union_categoricals([chunk[column] for chunk in chunks], sort_categories=True))
+            if isinstance(chunks[0][column].dtype, pd.CategoricalDtype)
+            else pd.concat([chunk[column] for chunk in chunks], ignore_index=True)
+            for column in chunks[0].columns
+        })
+    if 'Session Date' in df.columns:
+        dates = df['Session Date'].cat
+        df['Session Date'] = pd.to_datetime(dates.categories).take(dates.codes, allow_fill=True, fill_value=pd.NaT)
+
+    elapsed = time.perf_counter() - started
+    logger.info("Read %d rows x %d columns from %s in %.2fs (%.0f rows/s), %.1f MB in memory, peak RSS %.0f MB",
+                len(df), df.shape[1], path, elapsed, len(df) / max(elapsed, 1e-9),
+                df.memory_usage(deep=True).sum() / 2**20, peak_rss_mb())
+    return df
+
+
+# Monthly Parquet partitions of a dataset in the ingest store, oldest first
+def list_partitions(name):
+    directory = os.path.join(STORE_DIR, name)
+    if not os.path.isdir(directory):
+        return []
+    return [os.path.join(directory, file) for file in sorted(os.listdir(directory))
+            if file.endswith('.parquet') and not file.startswith('_')]
+
+
+def read_partitions(name):
+    return pd.concat([pd.read_parquet(path) for path in list_partitions(name)], ignore_index=True)
+
+
+# The files a dataset is read from: its store partitions, or the preprocessed CSV
+def dataset_files(name):
+    return list_partitions(name) or [_csv_path(name)]
+
+
+# Changes whenever the files behind a dataset change, so the cached frames
+# below are reloaded after an ingest without restarting the app
+def dataset_version(name):
+    paths = dataset_files(name)
+    return len(paths), max(os.path.getmtime(path) for path in paths)
+
+
+# Datasets whose columns are joined into another dataset's frames at load
+JOINED_DATASETS = {'gps': ('roster', 'calendar'), 'wellness': ('calendar',)}
+
+
+# Version of a dataset's loaded frames: its own files' and those of the
+# datasets joined into it (roster Position, calendar Day Rhythm), so a roster
+# or calendar update reloads the GPS and wellness frames too
+def frame_version(name):
+    return tuple(dataset_version(joined) for joined in (name, *JOINED_DATASETS.get(name, ())))
+
+
+# Read a dataset from the ingest store when it has been populated; otherwise from
+# the Parquet copy of the CSV when that is at least as new as the CSV, otherwise
+# parse the CSV once and convert it for the next cold start
+def read_dataset(name):
+    if list_partitions(name):
+        return apply_schema(read_partitions(name), DATASETS[name][1])
+
+    csv_path = _csv_path(name)
+    parquet_path = _parquet_path(name)
+    if os.path.exists(parquet_path) and os.path.getmtime(parquet_path) >= os.path.getmtime(csv_path):
+        try:
+            return pd.read_parquet(parquet_path)
+        except (ImportError, OSError, ValueError):
+            pass
+
+    df = apply_schema(pd.read_csv(csv_path), DATASETS[name][1])
+    _write_parquet(df, name)
+    return df
+
+
+# One-time conversion of every preprocessed CSV to Parquet
+def convert_to_parquet():
+    converted = []
+    for name in DATASETS:
+        df = apply_schema(pd.read_csv(_csv_path(name)), DATASETS[name][1])
+        if _write_parquet(df, name):
+            converted.append(_parquet_path(name))
+    return converted
+
+
+# Sort a frame so date (and player) filters become binary searches
+def sort_by_date(df, by_player=False):
+    keys = ['Player Name', 'Session Date'] if by_player else ['Session Date']
+    return df.sort_values(keys, kind='mergesort').reset_index(drop=True)
+
+
+# The frames below are loaded once per process and shared by every session
+# (cache_resource: no per-rerun hashing or pickling). Pages receive shallow
+# views; with copy-on-write a page that assigns or edits a column gets its
+# own copy of that column and the shared frame is never touched.
+def _view(df):
+    return df.copy(deep=False)
+
+
+# Columns derived from the raw GPS metrics, computed once at load
+def add_derived_gps_columns(gps_df, roster_df):
+    gps_df = gps_df.copy()
+
+    # Calculate the metrics (HSR)
+    gps_df['High Speed Running'] = gps_df['Distance Zone 5'] + gps_df['Distance Zone 6']
+
+    # Attach each player's Position once instead of merging the roster on every render
+    return attach_positions(gps_df, roster_df)
+
+
+# Set df's Position column from the roster's current Position of each player
+def attach_positions(df, roster_df):
+    df = df.copy()
+    positions = roster_df.drop_duplicates('Player Name').set_index('Player Name')['Position']
+    df['Position'] = df['Player Name'].map(positions).astype('category')
+    return df
+
+
+# 'MD-4' -> -4, 'MD' -> 0, 'MD+2' -> 2
+def md_offset(label):
+    return int(label[2:] or 0)
+
+
+# Attach each session date's match-day label and activity from the calendar.
+# Day Rhythm is an ordered categorical (MD-4 < ... < MD < MD+1) so groupbys and
+# charts follow the match-day cycle.
+def add_calendar_columns(df, calendar_df):
+    calendar = calendar_df.drop_duplicates('Date').set_index('Date')
+    day_rhythms = sorted(calendar['Day Rhythm'].dropna().unique(), key=md_offset)
+    df = df.copy()
+    df['Day Rhythm'] = pd.Categorical(df['Session Date'].map(calendar['Day Rhythm']),
+                                      categories=day_rhythms, ordered=True)
+    df['Activity'] = df['Session Date'].map(calendar['Activity']).astype('category')
+    return df
+
+
+# Each loader takes the dataset version as its cache key; max_entries=1 drops
+# the previous frames once a newer version has been loaded.
+@st.cache_resource(max_entries=1)
+def _load_calendar(version):
+    return read_dataset('calendar')
+
+
+@st.cache_resource(max_entries=1)
+def _load_roster(version):
+    return read_dataset('roster')
+
+
+@st.cache_resource(max_entries=1)
+def _load_gps(version):
+    gps_df = add_derived_gps_columns(read_dataset('gps'), _load_roster(dataset_version('roster')))
+    gps_df = add_calendar_columns(gps_df, _load_calendar(dataset_version('calendar')))
+    return sort_by_date(gps_df)
+
+
+@st.cache_resource(max_entries=1)
+def _load_gps_by_player(version):
+    return sort_by_date(_load_gps(version), by_player=True)
+
+
+# Daily (date, player, drill, position) aggregate cube the team report rolls up.
+# ingest.py keeps one cube partition per GPS partition up to date; without a
+# store (or when the stored partitions predate a cube metric) the cube is
+# built from the GPS frame. Stored partitions leave out Position, which is
+# taken from the current roster so a changed roster needs no rebuild.
+@st.cache_resource(max_entries=1)
+def _load_gps_cube(version):
+    if list_partitions('gps_cube'):
+        cube = categorize(read_partitions('gps_cube').drop(columns='Position', errors='ignore'))
+        cube = attach_positions(cube, _load_roster(dataset_version('roster')))
+        if all(f'{metric}|sum' in cube.columns for metric in aggregates.CUBE_METRICS):
+            return aggregates.finish_cube(cube, _load_gps(version))
+    return aggregates.build_daily_cube(_load_gps(version))
+
+
+# One row per player and session day, rolled up from the cube once and tagged
+# with the match-day calendar, for the MD-offset profiles
+@st.cache_resource(max_entries=1)
+def _load_gps_player_days(version):
+    player_days = aggregates.rollup(_load_gps_cube(version), ['Session Date', 'Player Name'], PLAYER_DAY_METRICS)
+    return add_calendar_columns(player_days, _load_calendar(dataset_version('calendar')))
+
+
+def workload_path(method):
+    return os.path.join(STORE_DIR, 'workload', f'{method}.parquet')
+
+
+# Acute:chronic workload frames, sorted by (Player Name, Session Date).
+# ingest.py extends the stored frames day by day; without them the whole
+# history is computed from the GPS frame.
+@st.cache_resource(max_entries=len(workload.METHODS))
+def _load_workload(version, method):
+    path = workload_path(method)
+    if list_partitions('gps') and os.path.exists(path):
+        return categorize(pd.read_parquet(path))
+    return workload.compute_workload(_load_gps(version[0]), method)
+
+
+@st.cache_resource(max_entries=1)
+def _load_wellness(version):
+    wellness_df = add_calendar_columns(read_dataset('wellness'), _load_calendar(dataset_version('calendar')))
+    return sort_by_date(wellness_df)
+
+
+@st.cache_resource(max_entries=1)
+def _load_wellness_by_player(version):
+    return sort_by_date(_load_wellness(version), by_player=True)
+
+
+@profiling.timed('load')
+def load_calendar():
+    return _view(_load_calendar(dataset_version('calendar')))
+
+
+@profiling.timed('load')
+def load_gps():
+    return _view(_load_gps(frame_version('gps')))
+
+
+@profiling.timed('load')
+def load_gps_by_player():
+    return _view(_load_gps_by_player(frame_version('gps')))
+
+
+@profiling.timed('load')
+def load_gps_cube():
+    return _view(_load_gps_cube(frame_version('gps')))
+
+
+@profiling.timed('load')
+def load_workload(method='rolling'):
+    path = workload_path(method)
+    version = frame_version('gps'), os.path.getmtime(path) if os.path.exists(path) else None
+    return _view(_load_workload(version, method))
+
+
+@profiling.timed('load')
+def load_gps_player_days():
+    return _view(_load_gps_player_days(frame_version('gps')))
+
+
+@profiling.timed('load')
+def load_wellness():
+    return _view(_load_wellness(frame_version('wellness')))
+
+
+@profiling.timed('load')
+def load_wellness_by_player():
+    return _view(_load_wellness_by_player(frame_version('wellness')))
+
+
+@profiling.timed('load')
+def load_roster():
+    return _view(_load_roster(dataset_version('roster')))
+
+
+# Load every dataset used by the pages
+def load_all():
+    return load_calendar(), load_gps(), load_wellness(), load_roster()
+
+
+# Positions [lo, hi) of the rows between start_date and end_date (inclusive)
+# in an array of sorted datetime64 values
+def _date_bounds(dates, start_date, end_date):
+    start = np.datetime64(pd.Timestamp(start_date).normalize())
+    stop = np.datetime64(pd.Timestamp(end_date).normalize() + pd.Timedelta(days=1))
+    return dates.searchsorted(start, side='left'), dates.searchsorted(stop, side='left')
+
+
+# Rows of a frame sorted by Session Date that fall in the date range
+@profiling.timed('filter')
+def date_slice(df, start_date, end_date):
+    lo, hi = _date_bounds(df['Session Date'].to_numpy(), start_date, end_date)
+    return df.iloc[lo:hi]
+
+
+# Rows of one player in the date range, for frames sorted by (Player Name, Session Date).
+# Sorting a categorical orders rows by category code, so both lookups are binary searches.
+@profiling.timed('filter')
+def player_date_slice(df, player_name, start_date, end_date):
+    players = df['Player Name'].cat
+    if player_name not in players.categories:
+        return df.iloc[0:0]
+    codes = players.codes.to_numpy()
+    code = players.categories.get_loc(player_name)
+    lo, hi = codes.searchsorted(code, side='left'), codes.searchsorted(code, side='right')
+
+    player_df = df.iloc[lo:hi]
+    start, stop = _date_bounds(player_df['Session Date'].to_numpy(), start_date, end_date)
+    return player_df.iloc[start:stop]
+
+
+if __name__ == '__main__':
+    written = convert_to_parquet()
+    if written:
+        print("Converted:\n" + "\n".join(written))
+    else:
+        print("Parquet support is not installed; the app will keep reading the CSV files.")
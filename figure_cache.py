@@ -0,0 +1,43 @@
+import plotly.io as pio
+import streamlit as st
+import data_store
+import profiling
+import report_cache
+
+# Report figures memoized on (chart id, date range, player) plus the GPS and
+# wellness frame versions (roster and calendar included), so a rerun with unchanged filters reuses the built
+# Plotly figures instead of rebuilding them from the rows. Widget choices that
+# change a chart (metric, method) belong in its chart id.
+#
+#   fig = figure_cache.cached_figure('drill_chart', start_date, end_date, lambda: px.bar(...))
+#   st.plotly_chart(fig, key='drill_chart')
+#
+# A figure not yet built in this process is read from the JSON that
+# precompute_reports.py stored for the range (report_cache) when there is one.
+#
+# The cached object is shared by every session; st.plotly_chart only reads it
+# (it serializes a copy), so callers must not update it after the lookup.
+
+# Least recently used figures are evicted beyond this many
+FIGURE_CACHE_SIZE = 256
+
+
+@st.cache_resource(max_entries=FIGURE_CACHE_SIZE, show_spinner=False)
+def _cached_figure(chart_id, start_date, end_date, player_name, version, _build):
+    figure_json = report_cache.cached_figure_json(chart_id, start_date, end_date, player_name)
+    if figure_json is not None:
+        return pio.from_json(figure_json)
+    return _build()
+
+
+def data_version():
+    return data_store.frame_version('gps'), data_store.frame_version('wellness')
+
+
+def cached_figure(chart_id, start_date, end_date, build, player_name=None):
+    with profiling.stage('figure', chart_id):
+        return _cached_figure(chart_id, start_date, end_date, player_name, data_version(), build)
+
+
+def clear_figures():
+    _cached_figure.clear()
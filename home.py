@@ -1,11 +1,6 @@
 import streamlit as st
-from PIL import Image
 import pandas as pd
-
-# Load images
-stadium_image = Image.open('Images/stadium.jpg')
-players_image = Image.open('Images/legends.jpg')
-trophy_image = Image.open('Images/trophies.jpg')
+import assets
 
 def display_home():
     # History of Real Madrid CF
@@ -43,7 +38,7 @@ def display_home():
     st.write("""**Real Madrid Club de Fútbol** is a legendary football club based in Madrid, Spain, founded in **1902**. The club has grown into one of the most successful and prestigious in the world, known for its success both in Spain and internationally.""")
 
     # Display Stadium Image
-    st.image(stadium_image, caption="Santiago Bernabéu Stadium", use_container_width=True)
+    st.image(assets.image_bytes('Images/stadium.jpg'), caption="Santiago Bernabéu Stadium", use_container_width=True)
 
     # Club Legends
     st.write("""Real Madrid has been home to some of the best footballers ever, including:
@@ -52,9 +47,8 @@ def display_home():
     - **Zinedine Zidane**: The French maestro who not only won titles but also led the club to three consecutive UEFA Champions League victories as a manager.
     """)
 
-    # Resize Legends Image
-    players_image_resized = players_image.resize((players_image.width, 400))
-    st.image(players_image_resized, caption="Real Madrid Legends", use_container_width=True)
+    # Legends Image (resized to 400 px high once per process)
+    st.image(assets.image_bytes('Images/legends.jpg', height=400), caption="Real Madrid Legends", use_container_width=True)
 
     # Achievements Table
     achievements_data = {
@@ -69,9 +63,8 @@ def display_home():
     st.markdown('<div class="subheader">Achievements</div>', unsafe_allow_html=True)
     st.dataframe(df, width=800)
 
-    # Resize Trophy Image
-    trophy_image_resized = trophy_image.resize((trophy_image.width, 1000))
-    st.image(trophy_image_resized, caption="Real Madrid Trophies", use_container_width=True)
+    # Trophy Image (resized to 1000 px high once per process)
+    st.image(assets.image_bytes('Images/trophies.jpg', height=1000), caption="Real Madrid Trophies", use_container_width=True)
 
     # Global Phenomenon Section
     st.markdown('<div class="subheader">Real Madrid: A Global Phenomenon</div>', unsafe_allow_html=True)
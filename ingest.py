@@ -0,0 +1,182 @@
+import argparse
+import json
+import os
+import pandas as pd
+import aggregates
+import data_store
+import preprocessing
+import workload
+
+# Usage:
+#   python ingest.py gps data/gps_data_preprocessed.csv --no-outlier-filter   (seed the store once)
+#   python ingest.py gps exports/gps_2022-10-04.csv                           (after every training day)
+#   python ingest.py wellness exports/wellness_2022-10-04.csv
+#   python ingest.py gps exports/gps_2023_season.csv --fences batch          (one-off export, limits from itself)
+#
+# New rows are cleaned like data_preprocessing.ipynb, deduplicated against the
+# store and appended to one Parquet partition per month under data/store/.
+# Only the months that received rows are rewritten, and only their GPS cube
+# partitions are rebuilt. The stored workload frames are extended from the
+# first new session day instead of being recomputed. Once a dataset has a store, data_store reads it
+# instead of the *_preprocessed.csv file.
+
+# A row already in the store with the same key is kept and the new copy skipped
+DEDUPE_KEYS = {
+    'gps': ['Player Name', 'Session Date', 'Drill Name'],
+    'wellness': ['Player Name', 'Session Date'],
+}
+
+# Outlier limits taken from the stored GPS history (written when the store is
+# seeded) and reused for every later batch, so a day's export is never
+# screened against its own few rows
+FENCES_PATH = os.path.join(data_store.STORE_DIR, 'gps', '_outlier_fences.json')
+
+# Where prepare_batch takes the outlier limits from: the stored history, or the
+# batch itself (only for a large one-off export, screened like the notebook)
+FENCE_SOURCES = ('history', 'batch')
+
+
+def _partition_path(name, key):
+    return os.path.join(data_store.STORE_DIR, name, f'{key}.parquet')
+
+
+# Write to a temporary file first so a crash never leaves a half-written partition
+def _write_partition(df, path):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    temp_path = path + '.tmp'
+    df.to_parquet(temp_path, index=False)
+    os.replace(temp_path, path)
+
+
+def _load_fences():
+    if not os.path.exists(FENCES_PATH):
+        return None
+    with open(FENCES_PATH) as fences_file:
+        return pd.DataFrame.from_dict(json.load(fences_file), orient='index')
+
+
+def _save_fences(fences):
+    os.makedirs(os.path.dirname(FENCES_PATH), exist_ok=True)
+    with open(FENCES_PATH, 'w') as fences_file:
+        json.dump(fences.to_dict(orient='index'), fences_file, indent=2)
+
+
+# IQR limits of every GPS row in the store
+def history_fences():
+    if not data_store.list_partitions('gps'):
+        raise ValueError("No stored GPS history to take the outlier limits from; "
+                         "seed the store with --no-outlier-filter first")
+    return preprocessing.outlier_fences(data_store.read_partitions('gps'), preprocessing.GPS_OUTLIER_COLUMNS)
+
+
+# The limits saved at seeding, or the stored history's when none were saved
+def stored_fences():
+    fences = _load_fences()
+    return history_fences() if fences is None else fences
+
+
+# Clean and type a raw export, screening GPS rows against the outlier limits of
+# fence_source (see FENCE_SOURCES). Returns the batch and the number of rows
+# each outlier column rejected.
+def prepare_batch(name, raw_df, filter_outliers=True, fence_source='history'):
+    if fence_source not in FENCE_SOURCES:
+        raise ValueError(f"Unknown fence source '{fence_source}', expected one of {FENCE_SOURCES}")
+    df = data_store.apply_schema(preprocessing.clean_data(raw_df), ['Session Date'])
+    rejected = pd.Series(dtype='int64', name='rows rejected')
+    # An export with no rows has nothing to screen (or to take batch limits from)
+    if name == 'gps' and filter_outliers and not df.empty:
+        if fence_source == 'history':
+            fences = stored_fences()
+        else:
+            fences = preprocessing.outlier_fences(df, preprocessing.GPS_OUTLIER_COLUMNS)
+        df, rejected = preprocessing.filter_outliers(df, fences=fences)
+    return df, rejected
+
+
+# Rebuild the cube partition of one month from that month's GPS rows
+def _update_cube_partition(key, roster_df):
+    gps_df = data_store.apply_schema(pd.read_parquet(_partition_path('gps', key)), ['Session Date'])
+    gps_df = data_store.add_derived_gps_columns(gps_df, roster_df)
+    # Position is looked up from the roster on load, so a roster change can't leave it stale
+    cube = aggregates.build_daily_cube(gps_df).drop(columns='Position')
+    _write_partition(cube, _partition_path('gps_cube', key))
+
+
+# Extend each stored workload frame with the appended GPS rows (computing the
+# whole history the first time)
+def _update_workload(new_rows, roster_df):
+    new_rows = data_store.add_derived_gps_columns(new_rows, roster_df)
+    for method in workload.METHODS:
+        path = data_store.workload_path(method)
+        if os.path.exists(path):
+            workload_df = workload.update_workload(pd.read_parquet(path), new_rows, method)
+        else:
+            gps_df = data_store.add_derived_gps_columns(data_store.read_dataset('gps'), roster_df)
+            workload_df = workload.compute_workload(gps_df, method)
+        _write_partition(workload_df, path)
+
+
+# Append the new sessions of a raw export to the store; returns a summary
+def ingest(name, raw_df, filter_outliers=True, fence_source='history'):
+    batch, rejected = prepare_batch(name, raw_df, filter_outliers, fence_source)
+    summary = {'rows read': len(raw_df), 'rows rejected': len(raw_df) - len(batch),
+               'rejected by column': rejected[rejected > 0].to_dict(),
+               'rows duplicated': 0, 'rows appended': {}}
+    appended_rows = []
+
+    for key, rows in batch.groupby(batch['Session Date'].dt.strftime('%Y-%m')):
+        path = _partition_path(name, key)
+        existing = pd.read_parquet(path) if os.path.exists(path) else rows.iloc[0:0]
+        combined = data_store.categorize(pd.concat([existing, rows], ignore_index=True))
+        combined = combined.drop_duplicates(DEDUPE_KEYS[name], keep='first')
+
+        appended = len(combined) - len(existing)
+        summary['rows duplicated'] += len(rows) - appended
+        if appended:
+            _write_partition(data_store.sort_by_date(combined), path)
+            summary['rows appended'][key] = appended
+            appended_rows.append(combined[combined.index >= len(existing)])
+
+    if name == 'gps' and summary['rows appended']:
+        roster_df = data_store.read_dataset('roster')
+        for key in summary['rows appended']:
+            _update_cube_partition(key, roster_df)
+        _update_workload(data_store.categorize(pd.concat(appended_rows, ignore_index=True)), roster_df)
+        # Unscreened rows (the seed) are trusted history: the limits come from them
+        if not filter_outliers:
+            _save_fences(history_fences())
+
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Append new GPS or wellness sessions to the partitioned data store.')
+    parser.add_argument('dataset', choices=sorted(DEDUPE_KEYS), help='Which export the files contain.')
+    parser.add_argument('files', nargs='+', help='Raw CSV exports to ingest.')
+    parser.add_argument('--no-outlier-filter', action='store_true',
+                        help='Skip the IQR outlier screen (for files that are already preprocessed).')
+    parser.add_argument('--fences', choices=FENCE_SOURCES, default='history',
+                        help='Take the outlier limits from the stored history (default) or from each file itself.')
+    args = parser.parse_args()
+
+    # Fail before reading any file when there is no history to screen against
+    if args.dataset == 'gps' and not args.no_outlier_filter and args.fences == 'history':
+        try:
+            stored_fences()
+        except ValueError as error:
+            parser.error(f"{error}, or pass --fences batch to take the limits from each file")
+
+    for path in args.files:
+        raw_df = data_store.read_gps_export(path) if args.dataset == 'gps' else pd.read_csv(path)
+        summary = ingest(args.dataset, raw_df, filter_outliers=not args.no_outlier_filter, fence_source=args.fences)
+        appended = summary['rows appended']
+        print(f"{path}: {summary['rows read']} read, {summary['rows rejected']} rejected, "
+              f"{summary['rows duplicated']} already stored, {sum(appended.values())} appended")
+        for key, count in appended.items():
+            print(f"  {key}: +{count}")
+        for column, count in summary['rejected by column'].items():
+            print(f"  outside the {column} limits: {count}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,235 @@
+import argparse
+import datetime
+import glob
+import hashlib
+import os
+import time
+import joblib
+import numpy as np
+import pandas as pd
+import sklearn
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.impute import SimpleImputer
+from sklearn.linear_model import LogisticRegression
+from sklearn.metrics import accuracy_score, f1_score, precision_score, recall_score, roc_auc_score
+from sklearn.model_selection import StratifiedKFold, cross_validate, train_test_split
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import FunctionTransformer, MinMaxScaler, StandardScaler
+import workload
+
+MODEL_PATH = 'injury_risk_model.pkl'
+
+# Artifact format: a dict carrying the fitted pipeline plus what is needed to use it safely.
+# Bump ARTIFACT_VERSION whenever the dict layout or the feature list changes.
+ARTIFACT_FORMAT = 'injury-risk-pipeline'
+ARTIFACT_VERSION = 3
+
+# Acute:chronic ratios the model uses, from the EWMA workload (empty in a
+# player's first weeks; the pipeline's imputer fills them)
+WORKLOAD_METHOD = 'ewma'
+WORKLOAD_FEATURES = [workload.acwr_column('Total Distance'), workload.acwr_column('High Speed Running')]
+
+# Model inputs, in the order the pipeline expects them
+FEATURE_COLUMNS = ['Total Distance', 'Metres Per Minute', 'High Speed Running', 'Energy', 'Soreness', 'Stress'] + WORKLOAD_FEATURES
+
+# Feature importance adjustments from inury_prediction.ipynb, applied after min-max scaling
+# (Energy up, Soreness and Stress down; the workload ratios are unweighted)
+FEATURE_WEIGHTS = np.array([1.0, 1.0, 1.0, 1.5, 0.5, 0.5, 1.0, 1.0])
+
+# Labelling thresholds from inury_prediction.ipynb
+LOW_ENERGY_THRESHOLD = 3
+HIGH_SORENESS_THRESHOLD = 8
+HIGH_STRESS_THRESHOLD = 8
+HIGH_SPEED_RUNNING_THRESHOLD = 40
+
+
+# Estimators the training command can fit, by name
+ESTIMATORS = {
+    'logreg': lambda n_jobs, random_state: LogisticRegression(max_iter=1000, class_weight='balanced'),
+    'forest': lambda n_jobs, random_state: RandomForestClassifier(
+        n_estimators=300, class_weight='balanced', n_jobs=n_jobs, random_state=random_state),
+}
+
+# Scores reported by cross-validation and by the held-out split
+CV_SCORING = ['accuracy', 'precision', 'recall', 'f1', 'roc_auc']
+
+# The merged feature matrix is cached here, one file per set of input files
+FEATURE_CACHE_PREFIX = 'injury_features'
+
+
+# Join GPS drill rows with the player's wellness answers and workload ratios for the same day
+def build_feature_frame(gps_df, wellness_df, workload_df):
+    features_df = gps_df[['Player Name', 'Session Date', 'Drill Name', 'Total Distance', 'Metres Per Minute', 'High Speed Running']].merge(
+        wellness_df[['Player Name', 'Session Date', 'Energy', 'Soreness', 'Stress']],
+        on=['Player Name', 'Session Date'], how='inner')
+    return features_df.merge(workload_df[workload.WORKLOAD_KEYS + WORKLOAD_FEATURES],
+                             on=workload.WORKLOAD_KEYS, how='left')
+
+
+# The "high_risk" training label: any of the notebook's single-session thresholds crossed
+def label_high_risk(features_df):
+    return (
+        (features_df['Energy'] < LOW_ENERGY_THRESHOLD) |
+        (features_df['Soreness'] > HIGH_SORENESS_THRESHOLD) |
+        (features_df['Stress'] > HIGH_STRESS_THRESHOLD) |
+        (features_df['High Speed Running'] > HIGH_SPEED_RUNNING_THRESHOLD)
+    ).astype(int)
+
+
+def _weight_features(X, weights):
+    return X * weights
+
+
+# The notebook's preprocessing and model as one estimator:
+# MinMaxScaler -> feature weights -> median imputation -> StandardScaler -> classifier
+def build_pipeline(estimator=None):
+    if estimator is None:
+        estimator = ESTIMATORS['logreg'](None, None)
+    return Pipeline([
+        ('minmax', MinMaxScaler()),
+        ('weights', FunctionTransformer(_weight_features, kw_args={'weights': FEATURE_WEIGHTS})),
+        ('impute', SimpleImputer(strategy='median')),
+        ('scale', StandardScaler()),
+        ('model', estimator),
+    ])
+
+
+# Raw feature matrix in FEATURE_COLUMNS order (metres, m/min and 0-10 wellness scores)
+def feature_matrix(features_df, features=FEATURE_COLUMNS):
+    return features_df[features].to_numpy(dtype='float64', na_value=np.nan)
+
+
+# Fit on an 80/20 split like the notebook and return the pipeline with its held-out metrics
+def fit_pipeline(features_df, estimator=None, random_state=42):
+    X, y = feature_matrix(features_df), label_high_risk(features_df).to_numpy()
+    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=random_state)
+
+    pipeline = build_pipeline(estimator).fit(X_train, y_train)
+    y_pred = pipeline.predict(X_test)
+    metrics = {
+        'accuracy': accuracy_score(y_test, y_pred),
+        'precision': precision_score(y_test, y_pred, zero_division=0),
+        'recall': recall_score(y_test, y_pred, zero_division=0),
+        'f1': f1_score(y_test, y_pred, zero_division=0),
+        'roc_auc': roc_auc_score(y_test, pipeline.predict_proba(X_test)[:, 1]),
+    }
+    return pipeline, metrics
+
+
+# Mean of each score over stratified folds, with the folds fitted in parallel
+def cross_validate_pipeline(features_df, estimator=None, folds=5, n_jobs=-1, random_state=42):
+    X, y = feature_matrix(features_df), label_high_risk(features_df).to_numpy()
+    splitter = StratifiedKFold(n_splits=folds, shuffle=True, random_state=random_state)
+    scores = cross_validate(build_pipeline(estimator), X, y, cv=splitter, scoring=CV_SCORING,
+                            n_jobs=n_jobs, error_score=np.nan)
+    return {name: float(np.nanmean(scores[f'test_{name}'])) for name in CV_SCORING}
+
+
+def save_model(pipeline, path=MODEL_PATH, metrics=None, cv_metrics=None, estimator_name='logreg',
+               features_key=None):
+    joblib.dump({
+        'format': ARTIFACT_FORMAT,
+        'version': ARTIFACT_VERSION,
+        'features': FEATURE_COLUMNS,
+        'pipeline': pipeline,
+        'estimator': estimator_name,
+        'metrics': metrics or {},
+        'cv_metrics': cv_metrics or {},
+        'features_key': features_key,
+        'sklearn_version': sklearn.__version__,
+        'trained_at': datetime.datetime.now().isoformat(timespec='seconds'),
+    }, path)
+
+
+def load_model(path=MODEL_PATH):
+    artifact = joblib.load(path)
+    if not isinstance(artifact, dict) or artifact.get('format') != ARTIFACT_FORMAT:
+        raise ValueError(f"{path} is not an injury-risk pipeline artifact; retrain it with `python injury_model.py`")
+    if artifact['version'] != ARTIFACT_VERSION:
+        raise ValueError(f"{path} has artifact version {artifact['version']}, expected {ARTIFACT_VERSION}; retrain it")
+    return artifact
+
+
+# Probability of high injury risk for every row of raw features (2-D array or DataFrame)
+def predict_risk(artifact, features):
+    if hasattr(features, 'columns'):
+        features = feature_matrix(features, artifact['features'])
+    return artifact['pipeline'].predict_proba(features)[:, 1]
+
+
+# Hash of the contents of the files the feature matrix is built from (and of
+# the feature list, so changing it invalidates the cache)
+def hash_files(paths, salt=''):
+    digest = hashlib.sha256(salt.encode())
+    for path in sorted(paths):
+        digest.update(os.path.basename(path).encode())
+        with open(path, 'rb') as input_file:
+            for block in iter(lambda: input_file.read(1 << 20), b''):
+                digest.update(block)
+    return digest.hexdigest()[:16]
+
+
+def _feature_cache_path(key):
+    import data_store
+    return os.path.join(data_store.CACHE_DIR, f'{FEATURE_CACHE_PREFIX}.{key}.parquet')
+
+
+# The merged GPS + wellness feature matrix, read from the on-disk cache when the
+# GPS, wellness and roster files are unchanged since it was written, otherwise
+# rebuilt and cached (older cache files are removed). Returns (features, key).
+def load_feature_frame(refresh=False):
+    import data_store
+
+    key = hash_files([path for name in ('gps', 'wellness', 'roster') for path in data_store.dataset_files(name)],
+                     salt=','.join(FEATURE_COLUMNS))
+    path = _feature_cache_path(key)
+    if not refresh and os.path.exists(path):
+        return pd.read_parquet(path), key
+
+    gps_df = data_store.add_derived_gps_columns(data_store.read_dataset('gps'), data_store.read_dataset('roster'))
+    features_df = build_feature_frame(gps_df, data_store.read_dataset('wellness'),
+                                      workload.compute_workload(gps_df, WORKLOAD_METHOD))
+
+    os.makedirs(data_store.CACHE_DIR, exist_ok=True)
+    for stale_path in glob.glob(_feature_cache_path('*')):
+        os.remove(stale_path)
+    features_df.to_parquet(path + '.tmp', index=False)
+    os.replace(path + '.tmp', path)
+    return features_df, key
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Train the injury-risk pipeline and write the artifact the app loads.')
+    parser.add_argument('--estimator', choices=sorted(ESTIMATORS), default='logreg')
+    parser.add_argument('--folds', type=int, default=5, help='Cross-validation folds (0 to skip).')
+    parser.add_argument('--n-jobs', type=int, default=-1, help='Parallel jobs for cross-validation and the forest.')
+    parser.add_argument('--random-state', type=int, default=42)
+    parser.add_argument('--refresh-features', action='store_true', help='Rebuild the cached feature matrix.')
+    parser.add_argument('--output', default=MODEL_PATH)
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    features_df, key = load_feature_frame(refresh=args.refresh_features)
+    print(f"Feature matrix {key}: {len(features_df)} rows ({time.perf_counter() - started:.2f}s)")
+
+    estimator = ESTIMATORS[args.estimator](args.n_jobs, args.random_state)
+    cv_metrics = {}
+    if args.folds > 1:
+        cv_metrics = cross_validate_pipeline(features_df, estimator, args.folds, args.n_jobs, args.random_state)
+        print(f"{args.folds}-fold cross-validation:")
+        for name, value in cv_metrics.items():
+            print(f"  {name}: {value:.2f}")
+
+    pipeline, metrics = fit_pipeline(features_df, estimator, args.random_state)
+    save_model(pipeline, args.output, metrics, cv_metrics, args.estimator, key)
+    print("Held-out split:")
+    for name, value in metrics.items():
+        print(f"  {name}: {value:.2f}")
+    print(f"Saved {args.output} ({time.perf_counter() - started:.2f}s)")
+
+
+if __name__ == '__main__':
+    # Run through the imported module so the pickled pipeline references
+    # injury_model._weight_features rather than __main__._weight_features
+    import injury_model
+    injury_model.main()
@@ -1,12 +1,78 @@
+import os
 import streamlit as st
-import joblib
 import numpy as np
+import plotly.express as px
+import data_store
+import injury_model
+import profiling
+from injury_model import FEATURE_COLUMNS
 
-# Load the trained model
-model = joblib.load('injury_risk_model.pkl')
+# Changes whenever the model artifact is retrained
+def model_version():
+    return os.path.getmtime(injury_model.MODEL_PATH)
+
+# Load the trained pipeline (scalers, weights, imputer and model) once per artifact
+# version, the first time the page needs it
+@st.cache_resource(max_entries=1)
+def _load_model(version):
+    return injury_model.load_model()
+
+def load_model():
+    return _load_model(model_version())
+
+# Join every GPS drill row in the date range with the player's wellness answers and workload ratios for that day
+@profiling.timed('aggregate')
+def build_squad_features(gps_df, wellness_df, workload_df, start_date, end_date):
+    return injury_model.build_feature_frame(data_store.date_slice(gps_df, start_date, end_date),
+                                            data_store.date_slice(wellness_df, start_date, end_date),
+                                            workload_df)
+
+# Score all rows with one pipeline call and keep each player-session's riskiest drill
+def score_squad(model, features_df):
+    with profiling.stage('predict', 'squad'):
+        scored = features_df.assign(**{'Injury Risk': injury_model.predict_risk(model, features_df)})
+    riskiest = scored.groupby(['Player Name', 'Session Date'], observed=True)['Injury Risk'].idxmax()
+    return scored.loc[riskiest].sort_values('Injury Risk', ascending=False).reset_index(drop=True)
+
+# Keyed on the GPS and wellness frame versions and the model version as well, so
+# an ingest or a retrained model shows up without restarting the app
+@st.cache_data
+def _squad_risk(start_date, end_date, data_version, model_version):
+    features_df = build_squad_features(data_store.load_gps(), data_store.load_wellness(),
+                                       data_store.load_workload(injury_model.WORKLOAD_METHOD), start_date, end_date)
+    if features_df.empty:
+        return features_df.assign(**{'Injury Risk': np.array([], dtype='float64')})
+    return score_squad(_load_model(model_version), features_df)
+
+def squad_risk(start_date, end_date):
+    data_version = data_store.frame_version('gps'), data_store.frame_version('wellness')
+    return _squad_risk(start_date, end_date, data_version, model_version())
+
+# Squad-wide view: risk for every player-session in the selected date range
+def display_squad_risk(start_date, end_date):
+    risk_df = squad_risk(start_date, end_date)
+    if risk_df.empty:
+        st.info("No sessions with both GPS and wellness data in the selected date range.")
+        return
+
+    st.subheader("Squad Risk Table")
+    st.dataframe(
+        risk_df[['Player Name', 'Session Date', 'Injury Risk', 'Drill Name'] + FEATURE_COLUMNS],
+        column_config={
+            'Session Date': st.column_config.DateColumn('Session Date'),
+            'Injury Risk': st.column_config.ProgressColumn('Injury Risk', format='%.2f', min_value=0.0, max_value=1.0),
+        },
+        hide_index=True, use_container_width=True)
+
+    st.subheader("Daily Risk Heatmap")
+    heatmap_data = risk_df.pivot(index='Player Name', columns='Session Date', values='Injury Risk').sort_index()
+    heatmap_data.columns = heatmap_data.columns.strftime('%Y-%m-%d')
+    fig = px.imshow(heatmap_data, color_continuous_scale='Reds', zmin=0, zmax=1, aspect='auto',
+                    labels=dict(x="Session Date", y="Player Name", color="Injury Risk"))
+    profiling.plotly_chart(fig, key="squad_risk_heatmap")
 
 # Function to display the injury prediction UI
-def display_injury_prediction():
+def display_injury_prediction(start_date, end_date):
     # Title with color (Real Madrid Blue), center alignment, and icon (only for this page)
     st.markdown(
         """
@@ -23,7 +89,15 @@ def display_injury_prediction():
            🚑 Injury Risk Prediction 🚑
         </div>
         """, unsafe_allow_html=True)
-   
+
+    single_tab, squad_tab = st.tabs(["🧍 Single Session", "👥 Whole Squad"])
+    with squad_tab:
+        display_squad_risk(start_date, end_date)
+    with single_tab:
+        display_single_prediction()
+
+# Score one manually entered session
+def display_single_prediction():
     # Create layout
     col1, col2 = st.columns(2)
     
@@ -31,11 +105,13 @@ def display_injury_prediction():
         total_distance = st.number_input("🏃 Total Distance (meters)", min_value=0.0, format="%.2f", help="Total distance run in meters during the session.")
         metres_per_minute = st.number_input("⏱️ Metres Per Minute", min_value=0.0, format="%.2f", help="Average running speed in meters per minute.")
         high_speed_running = st.number_input("⚡ High-Speed Running (meters)", min_value=0.0, format="%.2f", help="Total distance covered in high-speed running (e.g., sprinting).")
+        distance_acwr = st.number_input("📈 Distance ACWR", min_value=0.0, value=1.0, format="%.2f", help="7-day acute over 28-day chronic total distance (EWMA).")
         
     with col2:
         energy = st.slider("🔋 Energy Level", min_value=0, max_value=10, value=5, help="Current energy level on a scale from 0 (low) to 10 (high).")
         soreness = st.slider("💢 Soreness Level", min_value=0, max_value=10, value=5, help="Current soreness level on a scale from 0 (none) to 10 (severe).")
         stress = st.slider("😓 Stress Level", min_value=0, max_value=10, value=5, help="Current stress level on a scale from 0 (low) to 10 (high).")
+        hsr_acwr = st.number_input("📈 HSR ACWR", min_value=0.0, value=1.0, format="%.2f", help="7-day acute over 28-day chronic high-speed running (EWMA).")
     
     st.markdown("---")
     
@@ -48,14 +124,12 @@ def display_injury_prediction():
             else:
                 # Prepare the feature array for prediction
                 features = np.array([[total_distance, metres_per_minute, high_speed_running,
-                                      energy, soreness, stress]])
-                prediction = model.predict(features)
+                                      energy, soreness, stress, distance_acwr, hsr_acwr]])
+                with profiling.stage('predict', 'single'):
+                    risk = injury_model.predict_risk(load_model(), features)[0]
         
                 # Display the result with colors
-                if prediction == 1:
-                    st.error("🔥 **High Injury Risk!** Reduce intensity and prioritize recovery.")
+                if risk >= 0.5:
+                    st.error(f"🔥 **High Injury Risk ({risk:.0%})!** Reduce intensity and prioritize recovery.")
                 else:
-                    st.success("✅ **Low Injury Risk!** Keep up the great work.")
-
-# Run the UI
-display_injury_prediction()
+                    st.success(f"✅ **Low Injury Risk ({risk:.0%})!** Keep up the great work.")
@@ -2,13 +2,27 @@ import streamlit as st
 from openai import OpenAI
 import os
 from dotenv import load_dotenv
-from reportlab.lib.pagesizes import letter, landscape
-from reportlab.pdfgen import canvas
-import io
+import bulk_plans
+import data_store
+import plan_cache
+import plan_generator
+from plan_pdf import generate_pdf
 
 # Load environment variables
 load_dotenv()
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+
+# How often the page checks a plan that is still streaming in
+PLAN_POLL_SECONDS = 0.25
+
+# How often the page checks the progress of a squad batch
+SQUAD_POLL_SECONDS = 0.5
+
+
+# Create the OpenAI client once per process, the first time a plan is requested.
+# OPENAI_BASE_URL points it at another chat-completions server (e.g. stub_llm_server.py).
+@st.cache_resource
+def get_client():
+    return OpenAI(api_key=os.getenv("OPENAI_API_KEY"), base_url=os.getenv("OPENAI_BASE_URL"))
 
 # Function to calculate BMI
 def calculate_bmi(weight, height):
@@ -16,24 +30,6 @@ def calculate_bmi(weight, height):
         return weight / (height / 100) ** 2  # Convert height from cm to meters
     return 0
 
-# Function to generate PDF
-def generate_pdf(text):
-    buffer = io.BytesIO()
-    c = canvas.Canvas(buffer, pagesize=landscape(letter))  # Use landscape orientation
-    width, height = landscape(letter)  # Get landscape dimensions
-    y = height - 50
-
-    for line in text.split('\n'):
-        c.drawString(50, y, line)
-        y -= 15
-        if y < 50:
-            c.showPage()
-            y = height - 50
-
-    c.save()
-    buffer.seek(0)
-    return buffer
-
 # Function to display the personalized plan
 def display_personalized_plan():
     st.markdown(
@@ -70,6 +66,74 @@ def display_personalized_plan():
         unsafe_allow_html=True
     )
 
+    single_tab, squad_tab = st.tabs(["🧍 Single Player", "👥 Whole Squad"])
+    with single_tab:
+        display_single_plan()
+    with squad_tab:
+        display_squad_plans()
+
+# Plans for every roster player from the data files, generated concurrently and zipped as PDFs
+def display_squad_plans():
+    st.markdown('<p class="subtext">Generate plans for every roster player from their latest wellness answers and last week of GPS sessions.</p>', unsafe_allow_html=True)
+    wellness_df = data_store.load_wellness()
+    gps_df = data_store.load_gps()
+    as_of = st.date_input("Data as of", value=max(wellness_df['Session Date'].max(), gps_df['Session Date'].max()))
+
+    # The batch runs on a background thread (replacing any batch still running);
+    # the page polls it below
+    if st.button('🚀 Generate Plans for the Whole Squad', use_container_width=True):
+        previous = st.session_state.get('squad_plans')
+        if previous is not None:
+            previous[1].cancel()
+        squad_data = bulk_plans.squad_player_data(wellness_df, gps_df, data_store.load_roster(), as_of)
+        st.session_state['squad_plans'] = (as_of, bulk_plans.SquadPlansJob(squad_data))
+
+    display_squad_job()
+
+# The squad batch of this session: its progress while it runs, then the errors and the zip download
+def display_squad_job():
+    if 'squad_plans' not in st.session_state:
+        return
+    plans_as_of, job = st.session_state['squad_plans']
+    if not job.done:
+        poll_squad_plans()
+        return
+
+    if job.error is not None:
+        st.error(f"⚠️ The plans could not be generated: {job.error}")
+        return
+    if job.cancelled:
+        st.warning(f"⏹️ Cancelled after {job.completed}/{job.total} plans; "
+                   "the finished ones are in the plan cache for the next run.")
+        return
+    results = job.results
+    cached = sum(from_cache for _, _, from_cache, _ in results)
+    for player_name, _, _, error in results:
+        if error is not None:
+            st.error(f"⚠️ {player_name}: {error}")
+    st.success(f"✅ {len(results)} plans ({cached} from the plan cache) for {plans_as_of:%d %b %Y}.")
+    st.download_button(
+        label="📥 Download All Plans (zip of PDFs)",
+        data=job.zip_bytes,
+        file_name=f"squad_plans_{plans_as_of:%Y-%m-%d}.zip",
+        mime="application/zip"
+    )
+
+# Only this fragment reruns while the batch runs; a full rerun shows the results once it is done
+@st.fragment(run_every=SQUAD_POLL_SECONDS)
+def poll_squad_plans():
+    _, job = st.session_state['squad_plans']
+    if job.done:
+        st.rerun()
+
+    st.progress(job.completed / max(job.total, 1),
+                text=f"🧠 {job.completed}/{job.total} plans ready ({job.elapsed:.0f}s)")
+    if st.button('⏹️ Cancel', key='cancel_squad_plans'):
+        job.cancel()
+        st.rerun()
+
+# Plan for one player from hand-entered values
+def display_single_plan():
     st.markdown('<p class="subtext">Fill out the form below to get your personalized training, recovery, and diet plan.</p>', unsafe_allow_html=True)
 
     # ---- Player Physical Data ----
@@ -106,90 +170,78 @@ def display_personalized_plan():
     # ---- Generate Button ----
     st.markdown("<br>", unsafe_allow_html=True)
     if st.button('🚀 Generate Personalized Plan', use_container_width=True):
-        with st.spinner('🧠 Generating your optimized plan...'):
-
-            player_data = {
-                "energy": energy,
-                "sleep_quality": sleep_quality,
-                "stress": stress,
-                "soreness": soreness,
-                "total_distance": total_distance,
-                "high_speed_running": high_speed_running,
-                "minutes_per_session": minutes_per_session,
-                "num_sprints": num_sprints,
-                "weight": weight,
-                "height": height,
-                "bmi": bmi
-            }
-
-            prompt = f"""
-                
-                You are a professional sports performance expert. Based on the following player's physical and performance data, generate a structured and detailed plan in the following format:
-                
-                *** Here is your personalized performance, recovery, and nutrition plan: ***
-
-                🏋️ **Training Plan**
-                - **Focus Areas**: (e.g., Strength, Agility, Stamina, etc. based on the player's performance data)
-                - **Exercise Recommendations**: (List 3-5 exercises with sets, reps, and intensity recommendations)
-                - **Weekly Training Hours**: (e.g., X hours/week. Tailor based on energy level and soreness)
-                - **Performance Goals**: (e.g., Improve total distance, high-speed running, or sprints)
-
-                🛌 **Recovery Plan**
-                - **Rest Days**: (e.g., 2-3 days/week depending on soreness and stress levels)
-                - **Recovery Techniques**: (e.g., Massage, cryotherapy, active recovery, etc. customized for the player’s recovery needs)
-                - **Sleep Recommendations**: (e.g., Bedtime routine, optimal sleep duration for recovery and performance)
-                - **Additional Restorative Practices**: (e.g., Stretching, light recovery exercises, mindfulness)
-
-                🍽️ **Diet Plan**
-                - **Daily Caloric Intake**: (e.g., XXXX kcal/day based on weight, BMI, and energy needs)
-                - **Macronutrient Breakdown**: (e.g., XX% Carbs / XX% Protein / XX% Fat for optimal performance and recovery)
-                - **Hydration**: (e.g., 3 liters of water/day or more depending on the intensity of activity)
-                - **Sample Meals**: 
-                    - Breakfast: (e.g., Protein-rich, high-carb meal for energy)
-                    - Lunch: (e.g., Balanced meal with lean protein and complex carbs)
-                    - Dinner: (e.g., Light, easily digestible protein source with healthy fats)
-                    - Snacks: (e.g., Energy-boosting snacks for recovery or pre-workout)
-
-                Now generate a plan for this player:
-
-                - Weight: {weight} kg
-                - Height: {height} cm
-                - Energy Level: {energy}
-                - Stress Level: {stress}
-                - Sleep Quality: {sleep_quality}
-                - Soreness Level: {soreness}
-                - Total Distance: {total_distance} km
-                - High-Speed Running: {high_speed_running} km
-                - Minutes per Session: {minutes_per_session}
-                - Number of Sprints: {num_sprints}
-                - BMI: {bmi}
-
-                Be detailed but concise. Use bullet points for clarity and ensure each section follows the format above. Tailor the plan to the player’s current condition and optimize for future performance.
-
-            """
-
-
-            completion = client.chat.completions.create(
-                model="gpt-3.5-turbo",
-                messages=[
-                    {"role": "system", "content": "You are a performance optimization expert, helping football players with personalized training, recovery, and diet strategies."},
-                    {"role": "user", "content": prompt}
-                ]
-            )
-
-            plan = completion.choices[0].message.content
-
-            st.markdown('<div class="section-title">📋 Personalized Plan</div>', unsafe_allow_html=True)
-            st.markdown(f'<div class="plan-content">{plan}</div>', unsafe_allow_html=True)
-
-            # ---- Download as PDF ----
-            pdf = generate_pdf(plan)
-            st.download_button(
-                label="📥 Download Plan as PDF",
-                data=pdf,
-                file_name="personalized_plan.pdf",
-                mime="application/pdf"
-            )
-
-# Run the app
-display_personalized_plan()
+        player_data = {
+            "energy": energy,
+            "sleep_quality": sleep_quality,
+            "stress": stress,
+            "soreness": soreness,
+            "total_distance": total_distance,
+            "high_speed_running": high_speed_running,
+            "minutes_per_session": minutes_per_session,
+            "num_sprints": num_sprints,
+            "weight": weight,
+            "height": height,
+            "bmi": bmi
+        }
+
+        # Replace any plan still being generated; the new one comes from the plan
+        # cache when the same inputs were submitted before, otherwise it streams in below
+        previous_job = st.session_state.get('plan_job')
+        if previous_job is not None:
+            previous_job.cancel()
+        key = plan_cache.plan_key(player_data, plan_generator.PROMPT_VERSION, plan_generator.MODEL)
+        cached_plan = plan_cache.get_plan(key)
+        if cached_plan is not None:
+            st.session_state['plan_job'] = plan_generator.CachedPlan(cached_plan)
+        else:
+            st.session_state['plan_job'] = plan_generator.PlanJob(
+                get_client(), plan_generator.build_messages(player_data),
+                on_done=lambda plan: plan_cache.put_plan(key, plan))
+
+    display_plan_job()
+
+# The plan of this session: streamed in while it is generated, then shown with the PDF download
+def display_plan_job():
+    job = st.session_state.get('plan_job')
+    if job is None:
+        return
+
+    st.markdown('<div class="section-title">📋 Personalized Plan</div>', unsafe_allow_html=True)
+    if not job.done:
+        stream_plan()
+        return
+
+    plan = job.text
+    if job.error is not None:
+        st.error(f"⚠️ The plan could not be generated: {job.error}")
+    elif job.cancelled:
+        st.warning("⏹️ Plan generation was cancelled.")
+    if plan:
+        st.markdown(f'<div class="plan-content">{plan}</div>', unsafe_allow_html=True)
+    if plan and job.error is None and not job.cancelled:
+        stats = plan_cache.cache_stats()
+        st.caption(f"{'⚡ Served from the plan cache. ' if job.from_cache else ''}"
+                   f"Plan cache: {stats['hits']} hits, {stats['misses']} misses, {stats['entries']} plans stored.")
+
+        # ---- Download as PDF ----
+        pdf = generate_pdf(plan)
+        st.download_button(
+            label="📥 Download Plan as PDF",
+            data=pdf,
+            file_name="personalized_plan.pdf",
+            mime="application/pdf"
+        )
+
+# Only this fragment reruns while the plan streams in, so the rest of the page stays responsive.
+# Once the job is finished a full rerun renders the final plan and stops the polling.
+@st.fragment(run_every=PLAN_POLL_SECONDS)
+def stream_plan():
+    job = st.session_state.get('plan_job')
+    if job is None or job.done:
+        st.rerun()
+
+    st.markdown(f'<div class="plan-content">{job.text} ▌</div>', unsafe_allow_html=True)
+    st.caption(f"🧠 Generating your optimized plan... {job.elapsed:.0f}s")
+    if st.button('⏹️ Cancel', key='cancel_plan'):
+        job.cancel()
+        st.rerun()
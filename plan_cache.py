@@ -0,0 +1,93 @@
+import contextlib
+import hashlib
+import json
+import os
+import sqlite3
+import time
+
+# Generated plans keyed on the normalized player inputs, the prompt version and
+# the model, so identical requests are answered without calling the API again.
+CACHE_PATH = os.path.join('data', 'cache', 'plans.sqlite')
+
+# Plans expire after a day; beyond MAX_ENTRIES the least recently used are evicted
+PLAN_TTL_SECONDS = 24 * 60 * 60
+MAX_ENTRIES = 1000
+
+# Inputs are rounded before hashing so 75 and 75.0 (or float noise from the
+# BMI division) give the same key
+KEY_DECIMALS = 2
+
+
+# One short-lived connection per call (the plan worker threads write too);
+# the block is committed as one transaction
+@contextlib.contextmanager
+def _connect(path):
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    connection = sqlite3.connect(path, timeout=10)
+    try:
+        with connection:
+            connection.execute("CREATE TABLE IF NOT EXISTS plans (key TEXT PRIMARY KEY, plan TEXT NOT NULL, "
+                               "created REAL NOT NULL, last_used REAL NOT NULL)")
+            connection.execute("CREATE TABLE IF NOT EXISTS counters (name TEXT PRIMARY KEY, value INTEGER NOT NULL)")
+            yield connection
+    finally:
+        connection.close()
+
+
+def _count(connection, name):
+    connection.execute("INSERT INTO counters VALUES (?, 1) ON CONFLICT(name) DO UPDATE SET value = value + 1", (name,))
+
+
+def normalize(player_data):
+    normalized = {}
+    for name, value in player_data.items():
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            normalized[name] = str(value).strip().lower()
+        else:
+            normalized[name] = round(float(value), KEY_DECIMALS)
+    return normalized
+
+
+def plan_key(player_data, prompt_version, model):
+    payload = json.dumps({'inputs': normalize(player_data), 'prompt_version': prompt_version, 'model': model},
+                         sort_keys=True)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+# The stored plan for a key, or None when there is none or it has expired.
+# Every lookup counts as a hit or a miss.
+def get_plan(key, path=CACHE_PATH, ttl=PLAN_TTL_SECONDS):
+    now = time.time()
+    with _connect(path) as connection:
+        row = connection.execute("SELECT plan, created FROM plans WHERE key = ?", (key,)).fetchone()
+        if row is not None and now - row[1] > ttl:
+            connection.execute("DELETE FROM plans WHERE key = ?", (key,))
+            row = None
+        if row is None:
+            _count(connection, 'misses')
+            return None
+        connection.execute("UPDATE plans SET last_used = ? WHERE key = ?", (now, key))
+        _count(connection, 'hits')
+        return row[0]
+
+
+def put_plan(key, plan, path=CACHE_PATH, ttl=PLAN_TTL_SECONDS, max_entries=MAX_ENTRIES):
+    now = time.time()
+    with _connect(path) as connection:
+        connection.execute("INSERT OR REPLACE INTO plans VALUES (?, ?, ?, ?)", (key, plan, now, now))
+        connection.execute("DELETE FROM plans WHERE created < ?", (now - ttl,))
+        connection.execute("DELETE FROM plans WHERE key NOT IN "
+                           "(SELECT key FROM plans ORDER BY last_used DESC LIMIT ?)", (max_entries,))
+
+
+def cache_stats(path=CACHE_PATH):
+    with _connect(path) as connection:
+        stats = dict(connection.execute("SELECT name, value FROM counters").fetchall())
+        entries = connection.execute("SELECT COUNT(*) FROM plans").fetchone()[0]
+    return {'hits': stats.get('hits', 0), 'misses': stats.get('misses', 0), 'entries': entries}
+
+
+def clear_cache(path=CACHE_PATH):
+    with _connect(path) as connection:
+        connection.execute("DELETE FROM plans")
+        connection.execute("DELETE FROM counters")
@@ -0,0 +1,169 @@
+import threading
+import time
+
+# Chat model and the overall time a plan may take before it is abandoned
+MODEL = "gpt-3.5-turbo"
+PLAN_TIMEOUT = 60
+
+# Bump whenever the prompt below changes, so cached plans from the old one are not reused
+PROMPT_VERSION = 1
+
+SYSTEM_PROMPT = "You are a performance optimization expert, helping football players with personalized training, recovery, and diet strategies."
+
+
+# Prompt lines for the player's data: (label, player_data key, unit)
+PLAYER_FIELDS = [
+    ('Weight', 'weight', ' kg'),
+    ('Height', 'height', ' cm'),
+    ('Energy Level', 'energy', ''),
+    ('Stress Level', 'stress', ''),
+    ('Sleep Quality', 'sleep_quality', ''),
+    ('Soreness Level', 'soreness', ''),
+    ('Total Distance', 'total_distance', ' km'),
+    ('High-Speed Running', 'high_speed_running', ' km'),
+    ('Minutes per Session', 'minutes_per_session', ''),
+    ('Number of Sprints', 'num_sprints', ''),
+    ('BMI', 'bmi', ''),
+]
+
+
+# Values that are missing (None) are left out, e.g. weight and height for the
+# squad plans, which are built from the data files
+def build_prompt(player_data):
+    player_lines = '\n'.join(f"                - {label}: {player_data[key]}{unit}"
+                             for label, key, unit in PLAYER_FIELDS if player_data.get(key) is not None)
+    return f"""
+
+                You are a professional sports performance expert. Based on the following player's physical and performance data, generate a structured and detailed plan in the following format:
+
+                *** Here is your personalized performance, recovery, and nutrition plan: ***
+
+                🏋️ **Training Plan**
+                - **Focus Areas**: (e.g., Strength, Agility, Stamina, etc. based on the player's performance data)
+                - **Exercise Recommendations**: (List 3-5 exercises with sets, reps, and intensity recommendations)
+                - **Weekly Training Hours**: (e.g., X hours/week. Tailor based on energy level and soreness)
+                - **Performance Goals**: (e.g., Improve total distance, high-speed running, or sprints)
+
+                🛌 **Recovery Plan**
+                - **Rest Days**: (e.g., 2-3 days/week depending on soreness and stress levels)
+                - **Recovery Techniques**: (e.g., Massage, cryotherapy, active recovery, etc. customized for the player’s recovery needs)
+                - **Sleep Recommendations**: (e.g., Bedtime routine, optimal sleep duration for recovery and performance)
+                - **Additional Restorative Practices**: (e.g., Stretching, light recovery exercises, mindfulness)
+
+                🍽️ **Diet Plan**
+                - **Daily Caloric Intake**: (e.g., XXXX kcal/day based on weight, BMI, and energy needs)
+                - **Macronutrient Breakdown**: (e.g., XX% Carbs / XX% Protein / XX% Fat for optimal performance and recovery)
+                - **Hydration**: (e.g., 3 liters of water/day or more depending on the intensity of activity)
+                - **Sample Meals**:
+                    - Breakfast: (e.g., Protein-rich, high-carb meal for energy)
+                    - Lunch: (e.g., Balanced meal with lean protein and complex carbs)
+                    - Dinner: (e.g., Light, easily digestible protein source with healthy fats)
+                    - Snacks: (e.g., Energy-boosting snacks for recovery or pre-workout)
+
+                Now generate a plan for this player:
+
+{player_lines}
+
+                Be detailed but concise. Use bullet points for clarity and ensure each section follows the format above. Tailor the plan to the player’s current condition and optimize for future performance.
+
+            """
+
+
+def build_messages(player_data):
+    return [
+        {"role": "system", "content": SYSTEM_PROMPT},
+        {"role": "user", "content": build_prompt(player_data)},
+    ]
+
+
+# One streamed chat completion running on a background thread.
+# The page polls `text` while `done` is False, so the script thread never
+# waits on the network; cancel() stops reading and closes the connection.
+# on_done(text) is called from the worker once the whole plan has arrived.
+class PlanJob:
+    from_cache = False
+
+    def __init__(self, client, messages, model=MODEL, timeout=PLAN_TIMEOUT, on_done=None):
+        self.started = time.monotonic()
+        self._on_done = on_done
+        self.timeout = timeout
+        self.error = None
+        self._chunks = []
+        self._lock = threading.Lock()
+        self._cancelled = threading.Event()
+        self._finished = threading.Event()
+        self._stream = None
+        # The client timeout bounds each read, the deadline below the whole plan
+        client = client.with_options(timeout=timeout, max_retries=0)
+        self._thread = threading.Thread(target=self._run, args=(client, messages, model), daemon=True)
+        self._thread.start()
+
+    def _run(self, client, messages, model):
+        try:
+            with client.chat.completions.create(model=model, messages=messages, stream=True) as stream:
+                self._stream = stream
+                for chunk in stream:
+                    if self._cancelled.is_set():
+                        break
+                    if time.monotonic() - self.started > self.timeout:
+                        raise TimeoutError(f"The plan was not finished after {self.timeout} seconds.")
+                    content = chunk.choices[0].delta.content if chunk.choices else None
+                    if content:
+                        with self._lock:
+                            self._chunks.append(content)
+            if self._on_done is not None and not self._cancelled.is_set():
+                self._on_done(self.text)
+        except Exception as error:
+            # Closing the stream from cancel() interrupts the read; that is not an error
+            if not self._cancelled.is_set():
+                self.error = error
+        finally:
+            self._finished.set()
+
+    @property
+    def text(self):
+        with self._lock:
+            return ''.join(self._chunks)
+
+    @property
+    def done(self):
+        return self._finished.is_set()
+
+    @property
+    def cancelled(self):
+        return self._cancelled.is_set()
+
+    @property
+    def elapsed(self):
+        return time.monotonic() - self.started
+
+    def cancel(self):
+        self._cancelled.set()
+        if self._stream is not None and not self.done:
+            try:
+                self._stream.close()
+            except Exception:
+                pass
+
+    # Block until the job finishes (for scripts; the page polls instead)
+    def wait(self, timeout=None):
+        self._finished.wait(timeout)
+        return self.text
+
+
+# A plan that is already complete (from the plan cache), with the PlanJob interface
+class CachedPlan:
+    from_cache = True
+    done = True
+    cancelled = False
+    error = None
+    elapsed = 0.0
+
+    def __init__(self, text):
+        self.text = text
+
+    def cancel(self):
+        pass
+
+    def wait(self, timeout=None):
+        return self.text
@@ -0,0 +1,141 @@
+import functools
+import io
+import os
+import re
+import threading
+from xml.sax.saxutils import escape
+import reportlab
+from reportlab.lib import colors
+from reportlab.lib.enums import TA_CENTER
+from reportlab.lib.pagesizes import letter, landscape
+from reportlab.lib.styles import ParagraphStyle
+from reportlab.lib.units import inch
+from reportlab.pdfbase import pdfmetrics
+from reportlab.pdfbase.ttfonts import TTFont
+from reportlab.platypus import BaseDocTemplate, Frame, PageTemplate, Paragraph, Spacer
+
+PAGE_SIZE = landscape(letter)
+MARGIN = 0.6 * inch
+FONT_FAMILY = 'PlanSans'
+
+# TrueType families tried in order (regular, bold, italic, bold italic). DejaVu
+# covers far more symbols; reportlab always ships Vera as the fallback.
+_REPORTLAB_FONTS = os.path.join(os.path.dirname(reportlab.__file__), 'fonts')
+FONT_CANDIDATES = [
+    tuple(os.path.join(directory, f'DejaVuSans{suffix}.ttf') for suffix in ('', '-Bold', '-Oblique', '-BoldOblique'))
+    for directory in ('/usr/share/fonts/truetype/dejavu', '/usr/share/fonts/dejavu', '/Library/Fonts',
+                      os.path.join(os.environ.get('WINDIR', 'C:\\Windows'), 'Fonts'))
+] + [tuple(os.path.join(_REPORTLAB_FONTS, name) for name in ('Vera.ttf', 'VeraBd.ttf', 'VeraIt.ttf', 'VeraBI.ttf'))]
+
+HEADING_COLOR = colors.HexColor('#0288D1')  # Real Madrid Blue
+
+
+# Register the first available font family once per process. Returns the set of
+# characters it can draw; anything else (emoji, variation selectors) is dropped
+# from the text instead of rendering as black boxes.
+@functools.lru_cache(maxsize=None)
+def register_fonts():
+    paths = next(paths for paths in FONT_CANDIDATES if all(os.path.exists(path) for path in paths))
+    names = [FONT_FAMILY, f'{FONT_FAMILY}-Bold', f'{FONT_FAMILY}-Italic', f'{FONT_FAMILY}-BoldItalic']
+    for name, path in zip(names, paths):
+        pdfmetrics.registerFont(TTFont(name, path))
+    pdfmetrics.registerFontFamily(FONT_FAMILY, normal=names[0], bold=names[1], italic=names[2], boldItalic=names[3])
+    return frozenset(chr(code) for code in pdfmetrics.getFont(FONT_FAMILY).face.charToGlyph)
+
+
+@functools.lru_cache(maxsize=None)
+def paragraph_styles():
+    register_fonts()
+    body = ParagraphStyle('PlanBody', fontName=FONT_FAMILY, bulletFontName=FONT_FAMILY, fontSize=10.5, leading=14,
+                          spaceAfter=3)
+    return {
+        'title': ParagraphStyle('PlanTitle', parent=body, fontName=f'{FONT_FAMILY}-Bold', fontSize=18, leading=22,
+                                alignment=TA_CENTER, textColor=HEADING_COLOR, spaceAfter=12),
+        'heading1': ParagraphStyle('PlanHeading1', parent=body, fontName=f'{FONT_FAMILY}-Bold', fontSize=15,
+                                   leading=19, textColor=HEADING_COLOR, spaceBefore=10, spaceAfter=5),
+        'heading2': ParagraphStyle('PlanHeading2', parent=body, fontName=f'{FONT_FAMILY}-Bold', fontSize=12.5,
+                                   leading=16, textColor=HEADING_COLOR, spaceBefore=8, spaceAfter=4),
+        'body': body,
+        'bullet': [ParagraphStyle(f'PlanBullet{level}', parent=body, leftIndent=14 + 16 * level,
+                                  bulletIndent=4 + 16 * level, spaceAfter=2) for level in range(4)],
+    }
+
+
+# Page templates hold layout state while a document is built, so each thread
+# keeps its own and reuses it for every document it renders
+_templates = threading.local()
+
+
+def page_templates():
+    if not hasattr(_templates, 'value'):
+        width, height = PAGE_SIZE
+        frame = Frame(MARGIN, MARGIN, width - 2 * MARGIN, height - 2 * MARGIN, id='body')
+        _templates.value = [PageTemplate(id='plan', frames=[frame], onPage=_draw_page_number)]
+    return _templates.value
+
+
+def _draw_page_number(canvas, doc):
+    canvas.saveState()
+    canvas.setFont(FONT_FAMILY, 8)
+    canvas.setFillColor(colors.grey)
+    canvas.drawRightString(PAGE_SIZE[0] - MARGIN, MARGIN / 2, f"Page {doc.page}")
+    canvas.restoreState()
+
+
+HEADING = re.compile(r'^(#{1,6})\s+(.*)$')
+BULLET = re.compile(r'^(\s*)(?:[-*•+]|(\d+)[.)])\s+(.*)$')
+BOLD_LINE = re.compile(r'^(?:[^\w*]*\s*)?\*\*([^*]+)\*\*:?\s*$')
+TITLE_LINE = re.compile(r'^\*{3}\s*(.*?)\s*\*{3}$')
+INLINE_BOLD = re.compile(r'\*\*(.+?)\*\*|__(.+?)__')
+INLINE_ITALIC = re.compile(r'(?<![\w*])\*(?!\s)(.+?)(?<!\s)\*(?!\w)|(?<![\w_])_(?!\s)(.+?)(?<!\s)_(?!\w)')
+
+
+# Escape for reportlab's paragraph markup, drop characters the font cannot draw
+# and turn **bold** / *italic* into tags
+def _inline(text, charset):
+    text = escape(''.join(char for char in text if char in charset or char in '\t'))
+    text = INLINE_BOLD.sub(lambda match: f'<b>{match.group(1) or match.group(2)}</b>', text)
+    return INLINE_ITALIC.sub(lambda match: f'<i>{match.group(1) or match.group(2)}</i>', text)
+
+
+# Markdown-ish LLM output to flowables: headings, **bold-only** lines as
+# section headings, nested "-", "*" and "1." bullets, and wrapped paragraphs
+def plan_flowables(text, title=None):
+    charset = register_fonts()
+    styles = paragraph_styles()
+    flowables = []
+    if title:
+        flowables.append(Paragraph(_inline(title, charset), styles['title']))
+
+    for line in text.replace('\r\n', '\n').split('\n'):
+        stripped = line.strip()
+        if not stripped:
+            flowables.append(Spacer(1, 4))
+            continue
+        if TITLE_LINE.match(stripped):
+            flowables.append(Paragraph(_inline(TITLE_LINE.match(stripped).group(1), charset), styles['title']))
+        elif HEADING.match(stripped):
+            level, heading = HEADING.match(stripped).groups()
+            style = styles['heading1'] if len(level) == 1 else styles['heading2']
+            flowables.append(Paragraph(_inline(heading, charset), style))
+        elif BULLET.match(line):
+            indent, number, item = BULLET.match(line).groups()
+            level = min(len(indent.expandtabs(4)) // 2, len(styles['bullet']) - 1)
+            bullet = f'{number}.' if number else '•'
+            flowables.append(Paragraph(_inline(item, charset), styles['bullet'][level], bulletText=bullet))
+        elif BOLD_LINE.match(stripped):
+            flowables.append(Paragraph(_inline(stripped.replace('**', ''), charset), styles['heading2']))
+        else:
+            flowables.append(Paragraph(_inline(stripped, charset), styles['body']))
+    return flowables
+
+
+# Render a plan to PDF; returns a BytesIO positioned at the start
+def generate_pdf(text, title=None):
+    buffer = io.BytesIO()
+    doc = BaseDocTemplate(buffer, pagesize=PAGE_SIZE, pageTemplates=page_templates(),
+                          leftMargin=MARGIN, rightMargin=MARGIN, topMargin=MARGIN, bottomMargin=MARGIN,
+                          title=title or 'Personalized Plan', author='Sports Analytics')
+    doc.build(plan_flowables(text, title))
+    buffer.seek(0)
+    return buffer
@@ -1,26 +1,15 @@
 import streamlit as st
-import pandas as pd
-import plotly.express as px
-from scipy import stats
-from datetime import datetime
 from streamlit_extras.metric_cards import style_metric_cards
+import data_store
+import workload
+import reports
+import report_cache
+import report_figures
+import report_pdf
+import figure_cache
+import profiling
 
 
-@st.cache_data
-# Load data and cache it for performance
-def load_data():
-    calendar_df = pd.read_csv('data/calendar_preprocessed.csv')  # Adjust path as needed
-    gps_df = pd.read_csv('data/gps_data_preprocessed.csv')  # Adjust path as needed
-    wellness_df = pd.read_csv('data/wellness_preprocessed.csv')  # Adjust path as needed
-    roster_df = pd.read_csv('data/roster_preprocessed.csv')  # Adjust path as needed
-    
-    # Calculate the metrics (HSR)
-    gps_df['High Speed Running'] = gps_df['Distance Zone 5'] + gps_df['Distance Zone 6']
-    
-    return calendar_df, gps_df, wellness_df, roster_df
-
-calendar_df, gps_df, wellness_df, roster_df = load_data()
-
 # Streamlit UI Components
 def display_player_report(player_name, start_date, end_date):
     # Streamlit Header with Custom Styling
@@ -40,21 +29,26 @@ def display_player_report(player_name, start_date, end_date):
         </div>
         """, unsafe_allow_html=True)
 
-    # Filter based on the passed player_name and date range
-    filtered_gps_data = gps_df[(pd.to_datetime(gps_df['Session Date']) >= pd.to_datetime(start_date)) & (pd.to_datetime(gps_df['Session Date']) <= pd.to_datetime(end_date))]
-    filtered_wellness_data = wellness_df[(pd.to_datetime(wellness_df['Session Date']) >= pd.to_datetime(start_date)) & (pd.to_datetime(wellness_df['Session Date']) <= pd.to_datetime(end_date))]
+    # KPIs, the player's sliced rows and profiles come from reports.player_report
+    # (no Streamlit), or from the overnight job's entry for the standard ranges;
+    # this page only renders them
+    entry = report_cache.cached_entry('player', start_date, end_date, player_name)
+    report = entry['report'] if entry else reports.player_report(reports.load_frames(), player_name, start_date, end_date)
+    figure_builders = report_figures.player_figure_builders(report)
 
-    # Filter data for the selected player
-    player_gps_data = filtered_gps_data[filtered_gps_data['Player Name'] == player_name]
-    player_wellness_data = filtered_wellness_data[filtered_wellness_data['Player Name'] == player_name]
+    def figure(chart_id):
+        return figure_cache.cached_figure(chart_id, start_date, end_date, figure_builders[chart_id], player_name)
 
-    # Filtered Data for Player
-    player_roster = roster_df[roster_df['Player Name'] == player_name].iloc[0]
+    player_gps_data = report['gps']
+    player_wellness_data = report['wellness']
+    player_roster = report['roster']
+    age = report['age']
 
-    # Calculate the player's age based on DOB
-    birth_date = pd.to_datetime(player_roster['DOB'])
-    today = datetime.today()
-    age = today.year - birth_date.year - ((today.month, today.day) < (birth_date.month, birth_date.day))
+    # PDF export, built in the background from the report above
+    version = data_store.frame_version('gps'), data_store.frame_version('wellness')
+    report_pdf.display_pdf_export('player', (player_name, start_date, end_date), report_pdf.player_report_pdf,
+                                  (report, version),
+                                  f"{player_name}_report_{start_date:%Y%m%d}_{end_date:%Y%m%d}.pdf")
 
     # Display player details in a card-like format
     st.markdown(f'''
@@ -81,77 +75,65 @@ def display_player_report(player_name, start_date, end_date):
 
     # Create cards for key performance metrics
     col1, col2 = st.columns(2)
-    with col1:
-        st.metric("High Speed Running", f"{player_gps_data['High Speed Running'].mean():.2f} m", delta=None)
-    with col2:
-        avg_wellness_score = player_wellness_data['Total Score'].mean()
-        st.metric("Average Wellness Score", f"{avg_wellness_score:.2f}", delta=None)
+    for column, card in zip((col1, col2), report['cards']):
+        with column:
+            st.metric(card['label'], card['value'], delta=None)
 
     # Display performance metrics (Total Distance, Session Time, etc.)
     st.subheader("Performance Metrics")
     st.write(player_gps_data[['Session Date', 'Total Distance', 'High Speed Running', 'Session Time(mins)']])
 
-    # Calculate performance metrics
-    total_high_speed_running = player_gps_data['High Speed Running'].sum()
-    total_distance = player_gps_data['Total Distance'].sum()
+    # Add the Bar Chart for Performance Metrics Comparison
+    st.subheader("Performance Metrics Comparison")
 
-    max_game_high_speed_running = player_roster['Max Game High Speed Running']
-    max_game_total_distance = player_roster['Max Game Total Distance']
-    
-    # Calculate Daily Max HSR (similar to the DAX formula)
-    daily_max_hsr = player_gps_data.groupby('Player Name')['High Speed Running'].max().loc[player_name]
+    # Create Bar Chart 
+    fig = figure('performance')
+    profiling.plotly_chart(fig)
 
-    # Calculate Daily Max TD (similar to the DAX formula)
-    daily_max_td = player_gps_data.groupby('Player Name')['Total Distance'].max().loc[player_name]
+    # Acute (7-day) vs chronic (28-day) load. The workload frame covers the whole
+    # history, so the windows at the start of the range include the weeks before it.
+    st.subheader("Workload: Acute vs Chronic Load")
+    col1, col2 = st.columns(2)
+    with col1:
+        method = st.radio("Method", workload.METHODS, format_func=workload.METHOD_LABELS.get,
+                          horizontal=True, key="player_workload_method")
+    with col2:
+        metric = st.selectbox("Metric", workload.WORKLOAD_METRICS, key="player_workload_metric")
 
-    # Calculate percentage metrics
-    max_game_hsr = (total_high_speed_running / max_game_high_speed_running) * 100
-    max_game_td = (total_distance / max_game_total_distance) * 100
-    max_td = (total_distance / daily_max_td) * 100
-    max_hsr = (total_high_speed_running / daily_max_hsr) * 100
+    fig_load = figure(f'workload:{method}:{metric}')
+    fig_acwr = figure(f'acwr:{method}:{metric}')
 
-    # Add the Bar Chart for Performance Metrics Comparison
-    st.subheader("Performance Metrics Comparison")
-    performance_data = {
-        "Metric": ["% MAX Game HSR", "% MAX Game TD", "% MAX TD", "% MAX HSR"],
-        "Carvajal": [max_game_hsr, max_game_td, max_td, max_hsr]
-    }
-    performance_df = pd.DataFrame(performance_data)
+    col1, col2 = st.columns(2)
+    with col1:
+        profiling.plotly_chart(fig_load, key="player_workload_chart")
+    with col2:
+        profiling.plotly_chart(fig_acwr, key="player_acwr_chart")
 
-    # Create Bar Chart 
-    fig = px.bar(performance_df, x='Metric', y='Carvajal', 
-                 title='Performance Metrics Comparison',
-                 color_discrete_sequence=['#0288D1'])  # Real Madrid Blue
-    st.plotly_chart(fig)
+    # Match-day cycle: the player's average per-session load on each MD offset
+    # against the squad's, and wellness through the cycle
+    st.subheader("Match-Day Cycle Profile")
+    md_metric = st.selectbox("Metric", report_figures.MD_METRICS, index=1, key="player_md_metric")
+    fig_md = figure(f'md_profile:{md_metric}')
+    fig_wellness_md = figure('wellness_md')
+
+    col1, col2 = st.columns(2)
+    with col1:
+        profiling.plotly_chart(fig_md, key="player_md_chart")
+    with col2:
+        profiling.plotly_chart(fig_wellness_md, key="player_wellness_md_chart")
 
     # Create side-by-side visualizations
     col1, col2 = st.columns(2)
     with col1:
         # Scatter plot for High Speed Running vs Session Time
-        fig = px.scatter(player_gps_data, x='Session Date', y='High Speed Running',
-                         title=f'High Speed Running vs Session Time for {player_name}',
-                         labels={'Session Date': 'Date', 'High Speed Running': 'High Speed Running (m)'},
-                         color='High Speed Running', color_continuous_scale=['#0288D1', '#81D4FA'])  # Blue shades
-        st.plotly_chart(fig)
+        fig = figure('hsr_scatter')
+        profiling.plotly_chart(fig)
 
     with col2:
         # Create a Z-Score Wellness Plot for Energy
-        wellness_scores = player_wellness_data[['Session Date', 'Energy', 'Soreness', 'Sleep Quality', 'Stress', 'Total Score']]
-        wellness_scores['Z-Score Energy'] = stats.zscore(wellness_scores['Energy'])
-        fig4 = px.line(wellness_scores, x='Session Date', y='Z-Score Energy', 
-                       title=f'Energy Z-Score for {player_name}', 
-                       line_shape='linear', 
-                       color_discrete_sequence=['#0288D1'])  # Real Madrid Blue
-        st.plotly_chart(fig4)
+        fig4 = figure('energy_zscore')
+        profiling.plotly_chart(fig4)
 
     # Display wellness data (Energy, Sleep Quality, Stress, etc.)
     st.subheader("Wellness Metrics")
     st.write(player_wellness_data[['Session Date', 'Energy', 'Sleep Quality', 'Stress', 'Soreness', 'Total Score']])
-
-# Streamlit UI to select player and date range
-player_name = st.selectbox("Select Player", roster_df['Player Name'].unique())
-start_date = st.date_input("Start Date", min_value=min(gps_df['Session Date']), max_value=max(gps_df['Session Date']))
-end_date = st.date_input("End Date", min_value=min(gps_df['Session Date']), max_value=max(gps_df['Session Date']))
-
-# Run the player report display function
-display_player_report(player_name=player_name, start_date=start_date, end_date=end_date)
\ No newline at end of file
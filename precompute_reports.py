@@ -0,0 +1,139 @@
+import argparse
+import logging
+import os
+import time
+import warnings
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import pandas as pd
+import data_store
+import report_cache
+import report_figures
+import reports
+
+# Usage (e.g. nightly from cron, after the data files are updated):
+#   python precompute_reports.py
+#   python precompute_reports.py --workers 8 --days 7 28
+#   python precompute_reports.py --refresh          (recompute entries that already exist)
+#
+# Computes the team report and every roster player's report for the standard
+# date ranges and stores each one with the JSON of all its figures in
+# report_cache, so the pages open those ranges without computing anything.
+# The ranges are the sidebar's default (the whole GPS history), the last 7, 14
+# and 28 days up to the latest GPS session, and every Season week of the
+# calendar, clipped to the GPS dates the sidebar allows. Entries already stored
+# for the current data files are skipped; entries of older data files are removed.
+
+WINDOW_DAYS = [7, 14, 28]
+
+
+# (start, end) dates of the ranges above, as the sidebar's date input gives them
+def report_windows(gps_dates, calendar_df, days=WINDOW_DAYS):
+    first, last = gps_dates.min().normalize(), gps_dates.max().normalize()
+    windows = {(first, last)}
+    for length in days:
+        windows.add((max(first, last - pd.Timedelta(days=length - 1)), last))
+    weeks = calendar_df.groupby(['Season', 'week of Season'], observed=True)['Date'].agg(['min', 'max'])
+    for week_start, week_end in weeks.itertuples(index=False):
+        start, end = max(first, week_start.normalize()), min(last, week_end.normalize())
+        if start <= end:
+            windows.add((start, end))
+    return sorted((start.date(), end.date()) for start, end in windows)
+
+
+# Loaded once per worker process by the pool initializer
+_frames = None
+_gps = None
+
+
+def _load_worker_frames():
+    global _frames, _gps
+    # The cached loaders run without a Streamlit session here; their warnings about it are noise
+    logging.getLogger('streamlit').setLevel(logging.ERROR)
+    # Weeks where a player gave the same wellness answer every day have no spread to z-score
+    warnings.filterwarnings('ignore', message='Precision loss occurred in moment calculation')
+    _frames = reports.load_frames()
+    _gps = data_store.load_gps()
+
+
+# Compute and store one report; returns (kind, player, start, end, seconds, error)
+def precompute_entry(key, kind, player_name, start_date, end_date):
+    started = time.perf_counter()
+    try:
+        if kind == 'team':
+            report = reports.team_report(_frames, start_date, end_date)
+            builders = report_figures.team_figure_builders(report, data_store.date_slice(_gps, start_date, end_date))
+        else:
+            report = reports.player_report(_frames, player_name, start_date, end_date)
+            builders = report_figures.player_figure_builders(report)
+        figures = {chart_id: build().to_json() for chart_id, build in builders.items()}
+        report_cache.save_entry(key, kind, start_date, end_date, player_name, report, figures)
+    except Exception as error:
+        return kind, player_name, start_date, end_date, time.perf_counter() - started, error
+    return kind, player_name, start_date, end_date, time.perf_counter() - started, None
+
+
+# Store every report of the standard ranges that is not stored yet (all of them
+# with refresh). Returns a summary: the data fingerprint, the ranges, the
+# (kind, player, start, end) of the computed, skipped and failed reports, the
+# failures' errors, and whether the data files changed during the run (the
+# pages then ignore the entries until the next run).
+def precompute(workers=None, days=WINDOW_DAYS, players=True, refresh=False, on_progress=None):
+    key = report_cache.fingerprint()
+    stale = report_cache.remove_stale(key)
+
+    _load_worker_frames()
+    windows = report_windows(_gps['Session Date'], data_store.load_calendar(), days)
+    tasks = [('team', None, start, end) for start, end in windows]
+    if players:
+        tasks += [('player', player_name, start, end)
+                  for player_name in _frames['roster']['Player Name'].unique() for start, end in windows]
+    skipped = [] if refresh else [(kind, player_name, start, end) for kind, player_name, start, end in tasks
+                                  if os.path.exists(report_cache.entry_path(key, kind, start, end, player_name))]
+    tasks = [task for task in tasks if task not in skipped]
+
+    results = []
+    if tasks:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_load_worker_frames) as executor:
+            futures = [executor.submit(precompute_entry, key, *task) for task in tasks]
+            for future in as_completed(futures):
+                results.append(future.result())
+                if on_progress is not None:
+                    on_progress(len(results), len(tasks))
+    return {
+        'key': key, 'windows': windows, 'stale removed': stale,
+        'computed': [result[:4] for result in results if result[5] is None],
+        'skipped': skipped,
+        'failed': {result[:4]: result[5] for result in results if result[5] is not None},
+        'slowest seconds': max((result[4] for result in results), default=0.0),
+        'data changed': report_cache.fingerprint() != key,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Precompute the team and player reports for the standard date ranges.')
+    parser.add_argument('--workers', type=int, default=os.cpu_count(),
+                        help='Worker processes (default: one per CPU).')
+    parser.add_argument('--days', type=int, nargs='+', default=WINDOW_DAYS,
+                        help='Lengths of the "last N days" ranges.')
+    parser.add_argument('--team-only', action='store_true', help='Skip the player reports.')
+    parser.add_argument('--refresh', action='store_true', help='Recompute the reports that are already stored.')
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    summary = precompute(args.workers, args.days, not args.team_only, args.refresh,
+                         on_progress=lambda done, total: print(f"\r{done}/{total} reports", end='', flush=True))
+
+    print(f"\n{len(summary['computed'])} reports computed, {len(summary['skipped'])} already stored, "
+          f"over {len(summary['windows'])} date ranges in {time.perf_counter() - started:.1f}s "
+          f"(slowest {summary['slowest seconds']:.2f}s); cache: "
+          f"{os.path.join(report_cache.REPORT_CACHE_DIR, summary['key'])}")
+    if summary['stale removed']:
+        print(f"Removed {summary['stale removed']} stale cache directories")
+    for (kind, player_name, start_date, end_date), error in summary['failed'].items():
+        print(f"Failed: {player_name or kind} {start_date} - {end_date}: {error}")
+    if summary['data changed']:
+        print("The data files changed during the run; the pages will ignore these entries until the next run.")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,123 @@
+import numpy as np
+import pandas as pd
+
+# GPS metrics screened for outliers (the box-plot columns from data_preprocessing.ipynb)
+GPS_OUTLIER_COLUMNS = [
+    'Session Time(mins)', 'Total Distance', 'Metres Per Minute', 'Distance Zone 1', 'Distance Zone 2',
+    'Distance Zone 3', 'Distance Zone 4', 'Distance Zone 5', 'Distance Zone 6', 'HSR per min',
+    'Average Speed', 'Maximum Speed', 'Number of Sprints', 'Number of Accelerations',
+    'Accelerations Zone 1', 'Accelerations Zone 2', 'Accelerations Zone 3', 'Accelerations Zone 4',
+    'Accelerations Zone 5', 'Accelerations Zone 6', 'Number of Decelerations', 'Decelerations Zone 1',
+    'Decelerations Zone 2', 'Decelerations Zone 3', 'Decelerations Zone 4', 'Decelerations Zone 5',
+    'Decelerations Zone 6', 'HML Distance', 'HML Distance Per Minute', 'Average Step Impact Left (g)',
+    'Average Step Impact Right (g)', 'Step Balance', 'HML Efforts', 'Explosive Distance'
+]
+
+
+def clean_data(df):
+    # Drop duplicates
+    df_cleaned = df.drop_duplicates()
+    # Drop rows with any missing value
+    df_cleaned = df_cleaned.dropna(axis=0, how='any')
+    return df_cleaned
+
+
+# Check for date columns in a dataframe and convert them to datetime
+def convert_date_columns(df):
+    df = df.copy()
+    for column in df.columns:
+        # Only convert columns with strings in them, which could represent dates
+        if not pd.api.types.is_numeric_dtype(df[column]) and pd.to_datetime(df[column], errors='coerce').notna().all():
+            df[column] = pd.to_datetime(df[column], errors='coerce')
+    return df
+
+
+# IQR outlier limits, one (lower, upper) row per column.
+# All quartiles come from a single DataFrame.quantile call. Raises ValueError
+# when a column has no values to take its quartiles from.
+def outlier_fences(df, columns):
+    quartiles = df[columns].quantile([0.25, 0.75]).to_numpy(dtype='float64')
+    empty = [column for column, quartile in zip(columns, quartiles[0]) if np.isnan(quartile)]
+    if empty:
+        raise ValueError(f"No values to compute the outlier limits of {', '.join(empty)} from")
+    IQR = quartiles[1] - quartiles[0]
+    return pd.DataFrame({'lower': quartiles[0] - 1.5 * IQR, 'upper': quartiles[1] + 1.5 * IQR}, index=columns)
+
+
+# Drop every row that lies outside the limits of any column, with one combined
+# mask over the original frame, so the result does not depend on column order.
+# Returns the kept rows and the number of rows each column rejected (a row can
+# be rejected by several columns; missing values count as outside). Without
+# fences the limits come from df itself; to screen a small batch against a
+# longer history, pass that history's outlier_fences.
+def filter_outliers(df, columns=None, fences=None):
+    if columns is None and fences is None:
+        raise ValueError("Pass the columns to compute the outlier limits of, or their fences")
+    if fences is None:
+        fences = outlier_fences(df, columns)
+    columns = list(fences.index)
+    values = df[columns].to_numpy(dtype='float64', na_value=np.nan)
+    inside = (values >= fences['lower'].to_numpy()) & (values <= fences['upper'].to_numpy())
+    rejected = pd.Series((~inside).sum(axis=0), index=columns, name='rows rejected')
+    return df[inside.all(axis=1)], rejected
+
+
+def remove_outliers(df, columns):
+    return filter_outliers(df, columns)[0]
+
+
+# Uniform random sample of at most sample_size rows, built in one pass over the
+# chunks: every row draws a random key and the rows with the smallest keys win.
+def _sample_chunks(chunks, columns, sample_size, random_state):
+    rng = np.random.default_rng(random_state)
+    sample, keys = None, None
+    for chunk in chunks:
+        chunk_values = chunk[columns].to_numpy(dtype='float64', na_value=np.nan)
+        chunk_keys = rng.random(len(chunk_values))
+        if sample is not None:
+            chunk_values = np.concatenate([sample, chunk_values])
+            chunk_keys = np.concatenate([keys, chunk_keys])
+        if len(chunk_keys) > sample_size:
+            keep = np.argpartition(chunk_keys, sample_size)[:sample_size]
+            chunk_values, chunk_keys = chunk_values[keep], chunk_keys[keep]
+        sample, keys = chunk_values, chunk_keys
+    return pd.DataFrame(sample, columns=columns)
+
+
+# Streaming variant for raw exports too large to load whole. The first pass
+# estimates the quartiles from a reservoir sample (exact when the file has no
+# more than sample_size rows); the second pass filters the file chunk by chunk.
+# Kept rows are returned, or appended to output_path as CSV when one is given.
+def filter_outliers_streaming(path, columns, chunksize=100_000, sample_size=200_000,
+                              output_path=None, random_state=0, **read_csv_kwargs):
+    chunks = pd.read_csv(path, chunksize=chunksize, usecols=columns, **read_csv_kwargs)
+    fences = outlier_fences(_sample_chunks(chunks, columns, sample_size, random_state), columns)
+
+    kept_chunks = []
+    rejected = pd.Series(0, index=columns, name='rows rejected')
+    for i, chunk in enumerate(pd.read_csv(path, chunksize=chunksize, **read_csv_kwargs)):
+        kept, chunk_rejected = filter_outliers(chunk, fences=fences)
+        rejected += chunk_rejected
+        if output_path is None:
+            kept_chunks.append(kept)
+        else:
+            kept.to_csv(output_path, mode='w' if i == 0 else 'a', header=i == 0, index=False)
+
+    kept = pd.concat(kept_chunks, ignore_index=True) if kept_chunks else None
+    return kept, rejected, fences
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Remove IQR outliers from a raw GPS export in two streaming passes.')
+    parser.add_argument('input', help='Raw GPS CSV export.')
+    parser.add_argument('output', help='Where to write the kept rows (CSV).')
+    parser.add_argument('--chunksize', type=int, default=100_000)
+    parser.add_argument('--sample-size', type=int, default=200_000)
+    args = parser.parse_args()
+
+    _, rejected, _ = filter_outliers_streaming(args.input, GPS_OUTLIER_COLUMNS, chunksize=args.chunksize,
+                                               sample_size=args.sample_size, output_path=args.output)
+    print("Rows rejected per column:")
+    print(rejected[rejected > 0].sort_values(ascending=False).to_string())
@@ -0,0 +1,184 @@
+import collections
+import contextvars
+import functools
+import json
+import os
+import threading
+import time
+import pandas as pd
+import streamlit as st
+
+# Render profiling. Pages time their hot paths with
+#
+#   with profiling.stage('aggregate', 'team_summary'): ...
+#   @profiling.timed('load')
+#   profiling.plotly_chart(fig, key=...)     # st.plotly_chart, timed as 'emit'
+#
+# and app.py wraps each rerun in profiling.page(menu). Stages are 'load',
+# 'filter', 'aggregate', 'figure', 'predict' and 'emit'; every timing goes to a
+# ring buffer (shown as p50/p95 in the sidebar Diagnostics panel) and to a
+# JSON-lines file.
+#
+# Off unless PROFILE_RENDER=1 is set (every session of the process) or a
+# session was opened with ?diagnostics=1 (that session only); while off, stage()
+# hands back a shared no-op context and timed() two flag checks.
+ENABLED = os.getenv('PROFILE_RENDER') == '1'
+
+RING_SIZE = 5000
+PROFILE_LOG = os.getenv('PROFILE_LOG', os.path.join('data', 'cache', 'profile.jsonl'))
+
+# The log is rotated to PROFILE_LOG + '.1' (replacing the previous one) beyond this size
+PROFILE_LOG_MAX_BYTES = 10 * 2**20
+
+_timings = collections.deque(maxlen=RING_SIZE)
+_pending = []
+_lock = threading.Lock()
+_page = contextvars.ContextVar('profiled_page', default=None)
+_session_enabled = contextvars.ContextVar('profiled_session', default=False)
+
+
+# Profile the current session's rerun or not; app.py sets it at the start of every
+# rerun from the session's state, so it never carries over to other sessions
+def enable_session(enabled=True):
+    _session_enabled.set(enabled)
+
+
+def is_enabled():
+    return ENABLED or _session_enabled.get()
+
+
+def _record(stage_name, label, seconds):
+    page, run = _page.get() or (None, None)
+    timing = {'time': time.time(), 'page': page, 'run': run, 'stage': stage_name, 'label': label,
+              'ms': round(seconds * 1000, 3)}
+    with _lock:
+        _timings.append(timing)
+        _pending.append(timing)
+
+
+class _Stage:
+    __slots__ = ('stage', 'label', 'started')
+
+    def __init__(self, stage_name, label):
+        self.stage = stage_name
+        self.label = label
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        _record(self.stage, self.label, time.perf_counter() - self.started)
+        return False
+
+
+class _Off:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+_OFF = _Off()
+
+
+def stage(stage_name, label=None):
+    return _Stage(stage_name, label) if ENABLED or _session_enabled.get() else _OFF
+
+
+# Decorator timing every call of a function as `stage_name`, labelled with its name
+def timed(stage_name):
+    def decorator(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            if not (ENABLED or _session_enabled.get()):
+                return function(*args, **kwargs)
+            started = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                _record(stage_name, function.__name__, time.perf_counter() - started)
+        return wrapper
+    return decorator
+
+
+# One rerun of a page: everything timed inside is tagged with the page, the
+# whole run is recorded as stage 'total' and the timings are written to the log
+class page:
+    def __init__(self, name):
+        self.name = name
+        self.token = None
+
+    def __enter__(self):
+        if is_enabled():
+            self.token = _page.set((self.name, f'{time.time():.6f}'))
+            self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        if self.token is not None:
+            _record('total', self.name, time.perf_counter() - self.started)
+            _page.reset(self.token)
+            flush()
+        return False
+
+
+def plotly_chart(figure, **kwargs):
+    with stage('emit', kwargs.get('key')):
+        return st.plotly_chart(figure, **kwargs)
+
+
+# Append the timings recorded since the last flush to the JSON-lines log,
+# rotating it first once it has grown past max_bytes
+def flush(path=None, max_bytes=PROFILE_LOG_MAX_BYTES):
+    path = path or PROFILE_LOG
+    with _lock:
+        pending = _pending[:]
+        _pending.clear()
+        if not pending:
+            return
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        if os.path.exists(path) and os.path.getsize(path) > max_bytes:
+            os.replace(path, path + '.1')
+        with open(path, 'a', encoding='utf-8') as log_file:
+            log_file.writelines(json.dumps(timing) + '\n' for timing in pending)
+
+
+def timings():
+    with _lock:
+        return pd.DataFrame(list(_timings), columns=['time', 'page', 'run', 'stage', 'label', 'ms'])
+
+
+# Calls, p50, p95 and total milliseconds per page and stage over the ring buffer
+# (stages run several times per rerun are summed per run first)
+def summary(timings_df=None):
+    timings_df = timings() if timings_df is None else timings_df
+    per_run = timings_df.groupby(['page', 'stage', 'run'], dropna=False)['ms'].agg(['sum', 'count'])
+    grouped = per_run.groupby(level=['page', 'stage'], dropna=False)
+    return pd.DataFrame({
+        'runs': grouped['sum'].size(),
+        'calls per run': grouped['count'].mean(),
+        'p50 ms': grouped['sum'].median(),
+        'p95 ms': grouped['sum'].quantile(0.95),
+        'max ms': grouped['sum'].max(),
+    }).round(2).reset_index()
+
+
+def clear():
+    with _lock:
+        _timings.clear()
+
+
+def display_diagnostics():
+    if not is_enabled():
+        return
+    with st.sidebar.expander("🩺 Diagnostics"):
+        summary_df = summary()
+        if summary_df.empty:
+            st.caption("No timings recorded yet.")
+        else:
+            st.dataframe(summary_df, hide_index=True)
+        st.caption(f"Last {RING_SIZE:,} timings; log: {PROFILE_LOG}")
+        if st.button("Clear timings", key='clear_profiling'):
+            clear()
@@ -0,0 +1,97 @@
+import hashlib
+import json
+import os
+import pickle
+import shutil
+import pandas as pd
+import streamlit as st
+import data_store
+
+# Team and player reports computed ahead of time by precompute_reports.py: the
+# report dict of reports.py plus the JSON of every figure the page can show,
+# one pickle per (kind, player, date range). Entries live in a directory per
+# data fingerprint, so a changed data file (or a new REPORT_CACHE_VERSION)
+# makes the pages fall back to computing until the job has run again.
+#
+#   entry = report_cache.cached_entry('player', start_date, end_date, 'Modric')
+#   report = entry['report'] if entry else reports.player_report(...)
+#
+# The pages and figure_cache read entries; only the job writes them.
+REPORT_CACHE_DIR = os.path.join(data_store.CACHE_DIR, 'reports')
+
+# Bump when the report dicts or the figures change shape, to ignore older entries
+REPORT_CACHE_VERSION = 2
+
+# The data files every report is computed from
+REPORT_DATASETS = ('gps', 'wellness', 'roster', 'calendar')
+
+# Entries kept in memory by cached_entry
+MEMORY_ENTRIES = 64
+
+
+# Hash of the path, size and modification time of the report data files.
+# Only stats the files, so the pages can afford it on every rerun.
+def fingerprint():
+    digest = hashlib.sha256(f'v{REPORT_CACHE_VERSION}'.encode())
+    for name in REPORT_DATASETS:
+        for path in sorted(data_store.dataset_files(name)):
+            file_stat = os.stat(path)
+            digest.update(f'{path}:{file_stat.st_size}:{file_stat.st_mtime_ns}'.encode())
+    return digest.hexdigest()[:16]
+
+
+def _date_key(date):
+    return pd.Timestamp(date).date().isoformat()
+
+
+# kind is 'team' or 'player'; player_name is None for the team report
+def entry_path(key, kind, start_date, end_date, player_name=None, directory=REPORT_CACHE_DIR):
+    name = json.dumps([kind, player_name, _date_key(start_date), _date_key(end_date)])
+    return os.path.join(directory, key, hashlib.sha256(name.encode()).hexdigest()[:24] + '.pkl')
+
+
+# figures: chart id -> Plotly figure JSON (fig.to_json())
+def save_entry(key, kind, start_date, end_date, player_name, report, figures, directory=REPORT_CACHE_DIR):
+    path = entry_path(key, kind, start_date, end_date, player_name, directory)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path + '.tmp', 'wb') as entry_file:
+        pickle.dump({'report': report, 'figures': figures}, entry_file, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(path + '.tmp', path)
+    return path
+
+
+# Remove the entry directories of other fingerprints
+def remove_stale(key, directory=REPORT_CACHE_DIR):
+    removed = 0
+    if os.path.isdir(directory):
+        for name in os.listdir(directory):
+            if name != key:
+                shutil.rmtree(os.path.join(directory, name), ignore_errors=True)
+                removed += 1
+    return removed
+
+
+# Keyed on the file's mtime as well, so an entry rewritten by the job is re-read
+@st.cache_resource(max_entries=MEMORY_ENTRIES, show_spinner=False)
+def _read_entry(path, mtime):
+    with open(path, 'rb') as entry_file:
+        return pickle.load(entry_file)
+
+
+# The entry for the current data files, read once per process and shared by
+# every session (callers must not modify it), or None
+def cached_entry(kind, start_date, end_date, player_name=None):
+    path = entry_path(fingerprint(), kind, start_date, end_date, player_name)
+    try:
+        mtime = os.path.getmtime(path)
+    except OSError:
+        return None
+    return _read_entry(path, mtime)
+
+
+# The stored JSON of a chart, or None
+def cached_figure_json(chart_id, start_date, end_date, player_name=None):
+    entry = cached_entry('team' if player_name is None else 'player', start_date, end_date, player_name)
+    if entry is None:
+        return None
+    return entry['figures'].get(chart_id)
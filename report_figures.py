@@ -0,0 +1,126 @@
+import functools
+import plotly.express as px
+import plotly.graph_objects as go
+import chart_sampling
+import data_store
+import workload
+
+# Plotly figures of the team and player reports, built from the dicts in
+# reports.py without Streamlit. Each *_figure_builders function returns
+# chart id -> zero-argument builder for every chart the page can show; a chart
+# that depends on a widget has one id per choice ('acwr:ewma',
+# 'md_profile:Total Distance'). The pages pass the builders to figure_cache,
+# precompute_reports.py stores what they build.
+
+DRILL_COLORS = ["#0288D1", "#FF8A65", "#C5E1A5", "#8E24AA", "#FBC02D"]
+MD_METRICS = list(data_store.PLAYER_DAY_METRICS)
+
+
+def _team_acwr(squad_workload):
+    acwr_columns = [workload.acwr_column(metric) for metric in workload.WORKLOAD_METRICS]
+    fig_acwr = px.bar(squad_workload, x='Player Name', y=acwr_columns, barmode='group',
+                      title=f"ACWR on {squad_workload['Session Date'].iloc[0]:%d %b %Y}",
+                      labels={'value': 'ACWR', 'variable': ''})
+    fig_acwr.add_hrect(y0=workload.ACWR_SWEET_SPOT[0], y1=workload.ACWR_SWEET_SPOT[1],
+                       fillcolor='#C5E1A5', opacity=0.3, line_width=0)
+    return fig_acwr
+
+
+def _team_md_profile(report, md_metric):
+    return px.bar(report['md_profile'], x='Day Rhythm', y=md_metric, title=f"Squad Average {md_metric} by Match Day",
+                  color_discrete_sequence=['#0288D1'])
+
+
+def _team_md_profile_heatmap(report, md_metric):
+    return px.imshow(report['player_md_profile'].pivot(index='Player Name', columns='Day Rhythm', values=md_metric),
+                     title=f"{md_metric} by Player and Match Day", aspect='auto', color_continuous_scale='Blues')
+
+
+def _donut(drill_distribution):
+    drill_distance = drill_distribution[['Drill Name', 'Total Distance']]
+    fig_donut = go.Figure(data=[go.Pie(labels=drill_distance['Drill Name'], values=drill_distance['Total Distance'], hole=0.4, marker=dict(colors=["#FF5722", "#FBC02D", "#0288D1"]))])
+    fig_donut.update_layout(title="Total Distance Covered by Each Drill")
+    return fig_donut
+
+
+# gps_rows: the date-sliced GPS drill rows behind the scatter and box plots.
+# ACWR charts are left out for a method with no workload history in the range.
+def team_figure_builders(report, gps_rows):
+    player_data = report['player_data']
+    drill_distribution = report['drill_distribution']
+    game_performance = player_data[['Player Name', '% MAX TD', '% MAX HSR']]
+    drill_speed_distance = report['player_drill']
+    builders = {
+        'drill': lambda: px.bar(drill_distribution, x='Drill Name', y='Total Distance', color='Drill Name', title="Distance Covered in Each Drill", color_discrete_sequence=DRILL_COLORS),
+        'comparison': lambda: px.bar(player_data, x='Player Name', y=['Total Distance', 'Maximum Speed'], barmode='group', title="Player Comparison: Total Distance vs Speed"),
+        'position_drill': lambda: px.bar(report['position_drill'], x='Position', y='Total Distance', color='Drill Name', barmode='group'),
+        'game_comparison': lambda: px.bar(game_performance, x='Player Name', y=['% MAX TD', '% MAX HSR'], barmode='group', title="% Game TD & HSR Comparison"),
+        'heatmap': lambda: px.imshow(
+            drill_speed_distance.pivot(index='Player Name', columns='Drill Name', values='Total Distance'),
+            title="Heatmap: Player's Speed and Distance Across Drills", labels=dict(x="Drill Name", y="Player Name")),
+        'scatter': lambda: chart_sampling.scatter(gps_rows, 'Metres Per Minute', 'Total Distance', 'Drill Name', title="Speed vs Distance"),
+        'donut': functools.partial(_donut, drill_distribution),
+        'total_vs_speed': lambda: px.scatter(player_data, x='Total Distance', y='Maximum Speed', color='Player Name', title="Total Distance vs Max Speed"),
+        'kpi_distribution': lambda: chart_sampling.box(gps_rows, 'Player Name', 'Total Distance'),
+        'bubble': lambda: chart_sampling.scatter(gps_rows, 'Total Distance', 'Metres Per Minute', 'Drill Name', size='Session Time(mins)'),
+    }
+    for method, squad_workload in report['acwr'].items():
+        if not squad_workload.empty:
+            builders[f'acwr:{method}'] = functools.partial(_team_acwr, squad_workload)
+    for md_metric in MD_METRICS:
+        builders[f'md_profile:{md_metric}'] = functools.partial(_team_md_profile, report, md_metric)
+        builders[f'md_profile_heatmap:{md_metric}'] = functools.partial(_team_md_profile_heatmap, report, md_metric)
+    return builders
+
+
+def _player_load(player_workload, metric, player_name):
+    return px.line(player_workload, x='Session Date',
+                   y=[workload.acute_column(metric), workload.chronic_column(metric)],
+                   title=f'Acute vs Chronic {metric} for {player_name}',
+                   labels={'value': f'{metric} per day (m)', 'variable': ''},
+                   color_discrete_sequence=['#0288D1', '#FF8A65'])
+
+
+def _player_acwr(player_workload, metric):
+    fig_acwr = px.line(player_workload, x='Session Date', y=workload.acwr_column(metric),
+                       title=f'Acute:Chronic Workload Ratio ({metric})',
+                       color_discrete_sequence=['#0288D1'])
+    fig_acwr.add_hrect(y0=workload.ACWR_SWEET_SPOT[0], y1=workload.ACWR_SWEET_SPOT[1],
+                       fillcolor='#C5E1A5', opacity=0.3, line_width=0)
+    return fig_acwr
+
+
+def _player_md_profile(report, md_metric):
+    player_name = report['player_name']
+    md_profile = report['md_profile'][['Day Rhythm', md_metric, f'{md_metric} (Squad)']]
+    md_profile = md_profile.rename(columns={md_metric: player_name, f'{md_metric} (Squad)': 'Squad Average'})
+    return px.bar(md_profile, x='Day Rhythm', y=[player_name, 'Squad Average'], barmode='group',
+                  title=f'{md_metric} by Match Day', labels={'value': md_metric, 'variable': ''},
+                  color_discrete_sequence=['#0288D1', '#81D4FA'])
+
+
+def player_figure_builders(report):
+    player_name = report['player_name']
+    builders = {
+        'performance': lambda: px.bar(report['performance'], x='Metric', y=player_name,
+                                      title='Performance Metrics Comparison',
+                                      color_discrete_sequence=['#0288D1']),  # Real Madrid Blue
+        'wellness_md': lambda: px.line(report['wellness_md_profile'], x='Day Rhythm', y='Total Score', markers=True,
+                                       title=f'Wellness Score by Match Day for {player_name}',
+                                       color_discrete_sequence=['#0288D1']),
+        'hsr_scatter': lambda: px.scatter(report['gps'], x='Session Date', y='High Speed Running',
+                                          title=f'High Speed Running vs Session Time for {player_name}',
+                                          labels={'Session Date': 'Date', 'High Speed Running': 'High Speed Running (m)'},
+                                          color='High Speed Running', color_continuous_scale=['#0288D1', '#81D4FA']),  # Blue shades
+        'energy_zscore': lambda: px.line(report['wellness'], x='Session Date', y='Z-Score Energy',
+                                         title=f'Energy Z-Score for {player_name}',
+                                         line_shape='linear',
+                                         color_discrete_sequence=['#0288D1']),  # Real Madrid Blue
+    }
+    for method, player_workload in report['workload'].items():
+        for metric in workload.WORKLOAD_METRICS:
+            builders[f'workload:{method}:{metric}'] = functools.partial(_player_load, player_workload, metric, player_name)
+            builders[f'acwr:{method}:{metric}'] = functools.partial(_player_acwr, player_workload, metric)
+    for md_metric in MD_METRICS:
+        builders[f'md_profile:{md_metric}'] = functools.partial(_player_md_profile, report, md_metric)
+    return builders
@@ -0,0 +1,276 @@
+import collections
+import concurrent.futures
+import io
+import threading
+from xml.sax.saxutils import escape
+import streamlit as st
+from reportlab.graphics.charts.barcharts import VerticalBarChart
+from reportlab.graphics.charts.legends import Legend
+from reportlab.graphics.charts.linecharts import HorizontalLineChart
+from reportlab.graphics.shapes import Drawing, String
+from reportlab.lib import colors
+from reportlab.platypus import BaseDocTemplate, KeepTogether, Paragraph, Spacer, Table, TableStyle
+import plan_pdf
+
+# Usage from a page:
+#   report_pdf.display_pdf_export('team', (start_date, end_date), report_pdf.team_report_pdf, args, 'team_report.pdf')
+#
+# The page computes the report (reports.team_report / reports.player_report) as
+# usual; the PDFs are then built from it on a small thread pool so the page keeps
+# running while they render. Charts are reportlab drawings (no browser needed to rasterize
+# Plotly figures) and are cached per (report, date range, player, data version).
+
+EXPORT_WORKERS = 2
+CHART_CACHE_SIZE = 32
+
+CHART_WIDTH = 680
+CHART_HEIGHT = 220
+SERIES_COLORS = [colors.HexColor(color) for color in ('#0288D1', '#FF8A65', '#C5E1A5', '#8E24AA', '#FBC02D')]
+CARD_BACKGROUND = colors.HexColor('#E3F2FD')
+CARD_BORDER = colors.HexColor('#0288D1')
+NO_SESSIONS = "No sessions in the selected date range."
+
+_executor = concurrent.futures.ThreadPoolExecutor(max_workers=EXPORT_WORKERS, thread_name_prefix='report-pdf')
+
+_chart_cache = collections.OrderedDict()
+_chart_cache_lock = threading.Lock()
+
+
+# Charts of one report view, built once and reused until evicted (least recently used first)
+def cached_charts(key, build):
+    with _chart_cache_lock:
+        if key in _chart_cache:
+            _chart_cache.move_to_end(key)
+            return _chart_cache[key]
+    charts = build()
+    with _chart_cache_lock:
+        _chart_cache[key] = charts
+        while len(_chart_cache) > CHART_CACHE_SIZE:
+            _chart_cache.popitem(last=False)
+    return charts
+
+
+def _chart_title(drawing, title):
+    drawing.add(String(CHART_WIDTH / 2, CHART_HEIGHT - 14, title, fontName=f'{plan_pdf.FONT_FAMILY}-Bold',
+                       fontSize=11, textAnchor='middle', fillColor=plan_pdf.HEADING_COLOR))
+
+
+def _legend(drawing, names):
+    if len(names) < 2:
+        return
+    legend = Legend()
+    legend.x, legend.y = CHART_WIDTH - 150, CHART_HEIGHT - 26
+    legend.fontName, legend.fontSize = plan_pdf.FONT_FAMILY, 8
+    legend.alignment = 'right'
+    legend.colorNamePairs = list(zip(SERIES_COLORS, names))
+    drawing.add(legend)
+
+
+def _axes(chart, categories):
+    chart.x, chart.y = 50, 60
+    chart.width, chart.height = CHART_WIDTH - 80, CHART_HEIGHT - 100
+    chart.categoryAxis.categoryNames = [str(category) for category in categories]
+    chart.categoryAxis.labels.fontName = plan_pdf.FONT_FAMILY
+    chart.categoryAxis.labels.fontSize = 7
+    if len(categories) > 8:
+        chart.categoryAxis.labels.angle = 35
+        chart.categoryAxis.labels.boxAnchor = 'ne'
+    chart.valueAxis.labels.fontName = plan_pdf.FONT_FAMILY
+    chart.valueAxis.labels.fontSize = 7
+    chart.valueAxis.valueMin = 0
+
+
+# Shown instead of a chart or table with no rows (reportlab cannot scale an empty chart).
+# Paragraph text is markup, so names and labels are escaped like plan_pdf does.
+def no_sessions(title=None):
+    text = NO_SESSIONS if title is None else f"<b>{escape(title)}</b>: {NO_SESSIONS}"
+    return Paragraph(text, plan_pdf.paragraph_styles()['body'])
+
+
+# Grouped bar chart: series maps a name to one value per category
+def bar_chart(title, categories, series):
+    if len(categories) == 0:
+        return no_sessions(title)
+    drawing = Drawing(CHART_WIDTH, CHART_HEIGHT)
+    chart = VerticalBarChart()
+    _axes(chart, categories)
+    chart.data = [[float(value) if value == value else 0.0 for value in values] for values in series.values()]
+    for i in range(len(series)):
+        chart.bars[i].fillColor = SERIES_COLORS[i % len(SERIES_COLORS)]
+        chart.bars[i].strokeColor = None
+    drawing.add(chart)
+    _chart_title(drawing, title)
+    _legend(drawing, list(series))
+    return drawing
+
+
+def line_chart(title, categories, series):
+    if len(categories) == 0:
+        return no_sessions(title)
+    drawing = Drawing(CHART_WIDTH, CHART_HEIGHT)
+    chart = HorizontalLineChart()
+    _axes(chart, categories)
+    chart.data = [[float(value) if value == value else None for value in values] for values in series.values()]
+    for i in range(len(series)):
+        chart.lines[i].strokeColor = SERIES_COLORS[i % len(SERIES_COLORS)]
+        chart.lines[i].strokeWidth = 1.5
+    drawing.add(chart)
+    _chart_title(drawing, title)
+    _legend(drawing, list(series))
+    return drawing
+
+
+def metric_cards(cards):
+    styles = plan_pdf.paragraph_styles()
+    cells = [[Paragraph(escape(card['label']), styles['body']) for card in cards],
+             [Paragraph(f"<b>{escape(str(card['value']))}</b>", styles['heading1']) for card in cards]]
+    table = Table(cells, colWidths=[680 / len(cards)] * len(cards))
+    table.setStyle(TableStyle([
+        ('BACKGROUND', (0, 0), (-1, -1), CARD_BACKGROUND),
+        ('BOX', (0, 0), (-1, -1), 1.5, CARD_BORDER),
+        ('INNERGRID', (0, 0), (-1, -1), 1.5, colors.white),
+        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+    ]))
+    return table
+
+
+# A dataframe as a table with a repeated header row; floats get two decimals
+def data_table(df, columns):
+    if df.empty:
+        return no_sessions()
+
+    def cell(value):
+        if hasattr(value, 'strftime'):
+            return value.strftime('%Y-%m-%d')
+        if isinstance(value, float):
+            return f"{value:,.2f}"
+        return str(value)
+
+    rows = [columns] + [[cell(value) for value in row] for row in df[columns].itertuples(index=False)]
+    table = Table(rows, repeatRows=1)
+    table.setStyle(TableStyle([
+        ('FONTNAME', (0, 0), (-1, -1), plan_pdf.FONT_FAMILY),
+        ('FONTNAME', (0, 0), (-1, 0), f'{plan_pdf.FONT_FAMILY}-Bold'),
+        ('FONTSIZE', (0, 0), (-1, -1), 7.5),
+        ('BACKGROUND', (0, 0), (-1, 0), CARD_BORDER),
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
+        ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, CARD_BACKGROUND]),
+        ('ALIGN', (1, 1), (-1, -1), 'RIGHT'),
+        ('GRID', (0, 0), (-1, -1), 0.25, colors.lightgrey),
+    ]))
+    return table
+
+
+def _build(title, subtitle, sections):
+    plan_pdf.register_fonts()
+    styles = plan_pdf.paragraph_styles()
+    story = [Paragraph(escape(title), styles['title']), Paragraph(escape(subtitle), styles['body']), Spacer(1, 8)]
+    for heading, flowables in sections:
+        story.append(KeepTogether([Paragraph(escape(heading), styles['heading2']), flowables[0]]))
+        story.extend(flowables[1:])
+        story.append(Spacer(1, 6))
+
+    buffer = io.BytesIO()
+    doc = BaseDocTemplate(buffer, pagesize=plan_pdf.PAGE_SIZE, pageTemplates=plan_pdf.page_templates(),
+                          title=title, author='Sports Analytics')
+    doc.build(story)
+    return buffer.getvalue()
+
+
+def _date_range(start_date, end_date):
+    return f"{start_date:%d %b %Y} - {end_date:%d %b %Y}"
+
+
+def team_report_pdf(report, version):
+    start_date, end_date = report['start_date'], report['end_date']
+    player_data = report['player_data']
+    drill_distribution = report['drill_distribution']
+    md_profile = report['md_profile']
+
+    def build_charts():
+        return [
+            bar_chart("Player Comparison: Total Distance", player_data['Player Name'],
+                      {'Total Distance': player_data['Total Distance']}),
+            bar_chart("Distance Covered in Each Drill", drill_distribution['Drill Name'],
+                      {'Total Distance': drill_distribution['Total Distance']}),
+            bar_chart("Squad Average High Speed Running by Match Day", md_profile['Day Rhythm'],
+                      {'High Speed Running': md_profile['High Speed Running']}),
+        ]
+
+    charts = cached_charts(('team', start_date, end_date, None, version), build_charts)
+    return _build("Team Report", _date_range(start_date, end_date), [
+        ("Session Stats", [metric_cards(report['cards'])]),
+        ("Player Performance Data", [data_table(player_data, list(player_data.columns))]),
+        ("Player Comparison", [charts[0]]),
+        ("Drill-Specific Stats", [charts[1], data_table(drill_distribution, list(drill_distribution.columns))]),
+        ("Match-Day Cycle Load Profile", [charts[2]]),
+    ])
+
+
+def player_report_pdf(report, version):
+    player_name, start_date, end_date = report['player_name'], report['start_date'], report['end_date']
+    player_gps_data = report['gps']
+    player_wellness_data = report['wellness']
+    performance_df = report['performance']
+
+    def build_charts():
+        sessions = player_gps_data.groupby('Session Date', observed=True)[['Total Distance', 'High Speed Running']].sum()
+        wellness = player_wellness_data.set_index('Session Date')
+        dates = [date.strftime('%d %b') for date in sessions.index]
+        return [
+            bar_chart("Performance Metrics Comparison (%)", performance_df['Metric'],
+                      {player_name: performance_df[player_name]}),
+            bar_chart(f"High Speed Running per Session for {player_name}", dates,
+                      {'High Speed Running': sessions['High Speed Running']}),
+            line_chart(f"Wellness Scores for {player_name}", [date.strftime('%d %b') for date in wellness.index],
+                       {name: wellness[name] for name in ['Energy', 'Sleep Quality', 'Stress', 'Soreness']}),
+        ]
+
+    charts = cached_charts(('player', start_date, end_date, player_name, version), build_charts)
+    player_roster = report['roster']
+    subtitle = f"{player_roster['Position']} · Age {report['age']} · {_date_range(start_date, end_date)}"
+    return _build(f"{player_name} - Player Performance Report", subtitle, [
+        ("Key Metrics", [metric_cards(report['cards'])]),
+        ("Performance Metrics Comparison", [charts[0]]),
+        ("Performance Metrics", [charts[1], data_table(
+            player_gps_data, ['Session Date', 'Drill Name', 'Total Distance', 'High Speed Running', 'Session Time(mins)'])]),
+        ("Wellness Metrics", [charts[2], data_table(
+            player_wellness_data, ['Session Date', 'Energy', 'Sleep Quality', 'Stress', 'Soreness', 'Total Score'])]),
+    ])
+
+
+def submit(build, *args):
+    return _executor.submit(build, *args)
+
+
+# "Prepare PDF" button, then a download button once the background build is done.
+# One export per report is kept in the session; changing the filters starts over.
+def display_pdf_export(report, view, build, args, file_name):
+    state_key = f'pdf_export_{report}'
+    export = st.session_state.get(state_key)
+    if export is not None and export[0] != view:
+        export = None
+
+    if export is None:
+        if st.button("📄 Prepare PDF", key=f'prepare_pdf_{report}'):
+            export = (view, submit(build, *args))
+            st.session_state[state_key] = export
+        else:
+            return
+
+    future = export[1]
+    if not future.done():
+        _wait_for_pdf(future)
+    elif future.exception() is not None:
+        st.error(f"⚠️ The PDF could not be generated: {future.exception()}")
+    else:
+        st.download_button("📥 Download PDF", data=future.result(), file_name=file_name, mime="application/pdf",
+                           key=f'download_pdf_{report}')
+
+
+# Only this fragment reruns while the PDF is built; a full rerun shows the download button
+@st.fragment(run_every=0.5)
+def _wait_for_pdf(future):
+    if future.done():
+        st.rerun()
+    st.caption("⏳ Preparing PDF...")
@@ -0,0 +1,175 @@
+from datetime import datetime
+import pandas as pd
+from scipy import stats
+import aggregates
+import data_store
+import profiling
+import workload
+
+# Report computations without Streamlit: each function takes the frames and a
+# date range and returns a dict of the numbers and tables a report shows.
+# team_report.py and player_report.py only render these; the PDF export,
+# benchmarks and batch jobs call them directly, e.g.
+#
+#   frames = reports.load_frames()
+#   team = reports.team_report(frames, start_date, end_date)
+#   player = reports.player_report(frames, 'Modric', start_date, end_date)
+
+WELLNESS_ITEMS = ['Energy', 'Sleep Quality', 'Stress', 'Soreness']
+
+
+# The (shared, cached) frames the reports are computed from
+def load_frames():
+    return {
+        'gps_cube': data_store.load_gps_cube(),
+        'gps_by_player': data_store.load_gps_by_player(),
+        'player_days': data_store.load_gps_player_days(),
+        'wellness_by_player': data_store.load_wellness_by_player(),
+        'roster': data_store.load_roster(),
+        'workload': {method: data_store.load_workload(method) for method in workload.METHODS},
+    }
+
+
+# Session stats, per-player KPIs and per-drill totals of a date-sliced cube
+def team_summary(filtered_cube):
+    session_stats = aggregates.rollup(filtered_cube, [], {
+        'Total Distance': 'sum',
+        'Metres Per Minute': 'mean',
+        'Maximum Speed': 'max'
+    })
+    total_distance_card = session_stats['Total Distance']
+    avg_speed = session_stats['Metres Per Minute']
+    max_speed = session_stats['Maximum Speed']
+    rpe = ((max_speed + avg_speed / 1000) * 0.1) + 2  # Estimate RPE
+    hsr = avg_speed  # High-Speed Running (average speed)
+
+    # Metric data for displaying in cards
+    metric_data = [
+        {"label": "Total Distance", "value": f"{total_distance_card:.2f} meters", "delta": 0},
+        {"label": "RPE", "value": f"{rpe:.2f}", "delta": 0},
+        {"label": "HSR (Avg Speed)", "value": f"{hsr:.2f} m/s", "delta": 0},
+    ]
+
+    player_data = aggregates.rollup(filtered_cube, ['Player Name'], {
+        'Total Distance': 'sum',
+        'Maximum Speed': 'max',
+        'Metres Per Minute': 'mean',
+        'Explosive Distance': 'sum',
+        'Session Time(mins)': 'sum'
+    })
+
+    # Add new KPIs
+    player_data['% MAX TD'] = (player_data['Total Distance'] / total_distance_card) * 100
+    player_data['% MAX HSR'] = (player_data['Metres Per Minute'] / max_speed) * 100
+    player_data['% MAX SPD'] = (player_data['Maximum Speed'] / max_speed) * 100
+
+    drill_distribution = aggregates.rollup(filtered_cube, ['Drill Name'], {
+        'Total Distance': 'sum',
+        'Metres Per Minute': 'mean',
+        'Maximum Speed': 'max'
+    })
+    return {'cards': metric_data, 'player_data': player_data, 'drill_distribution': drill_distribution}
+
+
+# Everything the team report shows for a date range except the row-level
+# scatter and box plots: the summary above, position x drill and player x drill
+# roll-ups, each workload method's ACWR on the last day and the match-day
+# profiles of every player-day metric
+@profiling.timed('aggregate')
+def team_report(frames, start_date, end_date):
+    filtered_cube = data_store.date_slice(frames['gps_cube'], start_date, end_date)
+    player_days = data_store.date_slice(frames['player_days'], start_date, end_date)
+    metrics = list(data_store.PLAYER_DAY_METRICS)
+    return {
+        'start_date': start_date,
+        'end_date': end_date,
+        **team_summary(filtered_cube),
+        'position_drill': aggregates.rollup(filtered_cube, ['Position', 'Drill Name'], {'Total Distance': 'mean'}),
+        'player_drill': aggregates.rollup(filtered_cube, ['Player Name', 'Drill Name'], {
+            'Metres Per Minute': 'mean',
+            'Total Distance': 'sum'
+        }),
+        'acwr': {method: workload.workload_on(workload_df, end_date) for method, workload_df in frames['workload'].items()},
+        'player_days': player_days,
+        'md_profile': aggregates.md_profile(player_days, metrics),
+        'player_md_profile': aggregates.md_profile(player_days, metrics, by=['Player Name']),
+    }
+
+
+def player_age(date_of_birth, as_of=None):
+    birth_date = pd.to_datetime(date_of_birth)
+    today = as_of or datetime.today()
+    return today.year - birth_date.year - ((today.month, today.day) < (birth_date.month, birth_date.day))
+
+
+# Roster details, metric cards and % of max comparison for the player's
+# sliced GPS and wellness rows
+def player_summary(player_gps_data, player_wellness_data, roster_df, player_name):
+    # Filtered Data for Player
+    player_roster = roster_df[roster_df['Player Name'] == player_name].iloc[0]
+
+    # Calculate the player's age based on DOB
+    age = player_age(player_roster['DOB'])
+
+    cards = [
+        {"label": "High Speed Running", "value": f"{player_gps_data['High Speed Running'].mean():.2f} m"},
+        {"label": "Average Wellness Score", "value": f"{player_wellness_data['Total Score'].mean():.2f}"},
+    ]
+
+    # Calculate performance metrics
+    total_high_speed_running = player_gps_data['High Speed Running'].sum()
+    total_distance = player_gps_data['Total Distance'].sum()
+
+    max_game_high_speed_running = player_roster['Max Game High Speed Running']
+    max_game_total_distance = player_roster['Max Game Total Distance']
+
+    # Daily Max HSR and TD (similar to the DAX formulas)
+    daily_max_hsr = player_gps_data['High Speed Running'].max()
+    daily_max_td = player_gps_data['Total Distance'].max()
+
+    # Calculate percentage metrics
+    max_game_hsr = (total_high_speed_running / max_game_high_speed_running) * 100
+    max_game_td = (total_distance / max_game_total_distance) * 100
+    max_td = (total_distance / daily_max_td) * 100
+    max_hsr = (total_high_speed_running / daily_max_hsr) * 100
+
+    performance_df = pd.DataFrame({
+        "Metric": ["% MAX Game HSR", "% MAX Game TD", "% MAX TD", "% MAX HSR"],
+        player_name: [max_game_hsr, max_game_td, max_td, max_hsr]
+    })
+    return {'roster': player_roster, 'age': age, 'cards': cards, 'performance': performance_df,
+            'daily_max': {'High Speed Running': daily_max_hsr, 'Total Distance': daily_max_td}}
+
+
+# Wellness answers with a z-score column per item ('Z-Score Energy', ...)
+def wellness_z_scores(player_wellness_data):
+    wellness_scores = player_wellness_data[['Session Date'] + WELLNESS_ITEMS + ['Total Score']]
+    return wellness_scores.assign(**{f'Z-Score {item}': stats.zscore(wellness_scores[item])
+                                     for item in WELLNESS_ITEMS})
+
+
+# Everything the player report shows for a player and date range: the summary
+# above, the player's GPS and wellness rows (with z-scores), each workload
+# method's acute/chronic loads and the match-day profiles of every player-day
+# metric next to the squad's
+@profiling.timed('aggregate')
+def player_report(frames, player_name, start_date, end_date):
+    player_gps_data = data_store.player_date_slice(frames['gps_by_player'], player_name, start_date, end_date)
+    player_wellness_data = data_store.player_date_slice(frames['wellness_by_player'], player_name, start_date, end_date)
+    player_days = data_store.date_slice(frames['player_days'], start_date, end_date)
+    metrics = list(data_store.PLAYER_DAY_METRICS)
+
+    md_profile = aggregates.md_profile(player_days[player_days['Player Name'] == player_name], metrics)
+    squad_md_profile = aggregates.md_profile(player_days, metrics)
+    return {
+        'player_name': player_name,
+        'start_date': start_date,
+        'end_date': end_date,
+        **player_summary(player_gps_data, player_wellness_data, frames['roster'], player_name),
+        'gps': player_gps_data,
+        'wellness': wellness_z_scores(player_wellness_data),
+        'workload': {method: data_store.player_date_slice(workload_df, player_name, start_date, end_date)
+                     for method, workload_df in frames['workload'].items()},
+        'md_profile': md_profile.merge(squad_md_profile, on='Day Rhythm', how='left', suffixes=('', ' (Squad)')),
+        'wellness_md_profile': player_wellness_data.groupby('Day Rhythm', observed=True)['Total Score'].mean().reset_index(),
+    }
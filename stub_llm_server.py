@@ -0,0 +1,100 @@
+import argparse
+import json
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Local stand-in for the OpenAI chat-completions endpoint, for trying the plan
+# page (and the bulk plan tools) without an API key or network access:
+#
+#   python stub_llm_server.py --port 8001 --tokens 600 --delay 0.01
+#   OPENAI_BASE_URL=http://127.0.0.1:8001/v1 OPENAI_API_KEY=stub streamlit run app.py
+#
+# POST /v1/chat/completions answers with a canned plan of --tokens words,
+# streamed as server-sent events when the request sets "stream": true.
+
+PLAN_WORDS = (
+    "🏋️ **Training Plan**\n- **Focus Areas**: Stamina and high-speed running\n"
+    "- **Exercise Recommendations**: Tempo runs 6 x 200 m, Nordic curls 3 x 6, Box jumps 4 x 5\n"
+    "🛌 **Recovery Plan**\n- **Rest Days**: 2 days/week\n- **Sleep Recommendations**: 8-9 hours\n"
+    "🍽️ **Diet Plan**\n- **Daily Caloric Intake**: 3200 kcal/day\n- **Hydration**: 3.5 liters/day\n"
+).split(' ')
+
+
+def plan_tokens(count):
+    return [PLAN_WORDS[i % len(PLAN_WORDS)] + ' ' for i in range(count)]
+
+
+class ChatCompletionsHandler(BaseHTTPRequestHandler):
+    tokens = 600
+    delay = 0.01
+    first_token_delay = 0.2
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_POST(self):
+        if self.path.rstrip('/') not in ('/v1/chat/completions', '/chat/completions'):
+            self.send_error(404)
+            return
+        request = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))) or b'{}')
+        completion_id = f'chatcmpl-{uuid.uuid4().hex[:12]}'
+        model = request.get('model', 'stub')
+        tokens = plan_tokens(self.tokens)
+        time.sleep(self.first_token_delay)
+
+        if not request.get('stream'):
+            time.sleep(self.delay * len(tokens))
+            body = json.dumps({
+                'id': completion_id, 'object': 'chat.completion', 'created': int(time.time()), 'model': model,
+                'choices': [{'index': 0, 'finish_reason': 'stop',
+                             'message': {'role': 'assistant', 'content': ''.join(tokens)}}],
+                'usage': {'prompt_tokens': 0, 'completion_tokens': len(tokens), 'total_tokens': len(tokens)},
+            }).encode()
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+            return
+
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Cache-Control', 'no-cache')
+        self.end_headers()
+        try:
+            for i, token in enumerate(tokens + [None]):
+                delta = {'content': token} if token is not None else {}
+                if i == 0:
+                    delta['role'] = 'assistant'
+                chunk = {'id': completion_id, 'object': 'chat.completion.chunk', 'created': int(time.time()),
+                         'model': model, 'choices': [{'index': 0, 'delta': delta,
+                                                      'finish_reason': None if token is not None else 'stop'}]}
+                self.wfile.write(f'data: {json.dumps(chunk)}\n\n'.encode())
+                self.wfile.flush()
+                if token is not None:
+                    time.sleep(self.delay)
+            self.wfile.write(b'data: [DONE]\n\n')
+            self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # The client cancelled
+
+
+def serve(host='127.0.0.1', port=8001, tokens=600, delay=0.01, first_token_delay=0.2):
+    handler = type('Handler', (ChatCompletionsHandler,),
+                   {'tokens': tokens, 'delay': delay, 'first_token_delay': first_token_delay})
+    return ThreadingHTTPServer((host, port), handler)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Serve a stub OpenAI chat-completions API.')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8001)
+    parser.add_argument('--tokens', type=int, default=600, help='Words in every completion.')
+    parser.add_argument('--delay', type=float, default=0.01, help='Seconds between streamed words.')
+    parser.add_argument('--first-token-delay', type=float, default=0.2)
+    args = parser.parse_args()
+
+    server = serve(args.host, args.port, args.tokens, args.delay, args.first_token_delay)
+    print(f"Stub chat-completions API on http://{args.host}:{args.port}/v1")
+    server.serve_forever()
@@ -1,24 +1,16 @@
 import streamlit as st
-import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
 from streamlit_extras.metric_cards import style_metric_cards
-
-@st.cache_data
-def load_data():
-    calendar_df = pd.read_csv('data/calendar_preprocessed.csv')  # Adjust path as needed
-    gps_df = pd.read_csv('data/gps_data_preprocessed.csv')  # Adjust path as needed
-    wellness_df = pd.read_csv('data/wellness_preprocessed.csv')  # Adjust path as needed
-    roster_df = pd.read_csv('data/roster_preprocessed.csv')  # Adjust path as needed
-    
-    # Calculate the metrics (HSR)
-    gps_df['High Speed Running'] = gps_df['Distance Zone 5'] + gps_df['Distance Zone 6']
-    
-    return calendar_df, gps_df, wellness_df, roster_df
-
-calendar_df, gps_df, wellness_df, roster_df = load_data()
+import data_store
+import workload
+import reports
+import report_cache
+import report_figures
+import report_pdf
+import figure_cache
+import profiling
 
 def display_team_report(start_date, end_date):
+    gps_df = data_store.load_gps()
 
     st.markdown(
     """
@@ -36,29 +28,30 @@ def display_team_report(start_date, end_date):
     </div>
     """, unsafe_allow_html=True)
     
-    gps_df['Session Date'] = pd.to_datetime(gps_df['Session Date']).dt.date
-    wellness_df['Session Date'] = pd.to_datetime(wellness_df['Session Date']).dt.date
-
-    # Merge gps_df with roster_df to get the Position data
-    filtered_gps = pd.merge(gps_df, roster_df[['Player Name', 'Position']], on='Player Name', how='left')
-
-    # Filter gps_df based on the selected date range
-    filtered_gps = filtered_gps[(filtered_gps['Session Date'] >= start_date) & (filtered_gps['Session Date'] <= end_date)]
+    # KPIs and roll-ups come from reports.team_report (no Streamlit); this page only renders them.
+    # The overnight job (precompute_reports.py) stores them for the standard ranges, so those are
+    # only read. Slice gps_df (sorted by Session Date, Position attached at load) to the selected
+    # date range: the raw rows are only needed for the scatter and box plots, which chart_sampling
+    # keeps to a fixed point budget.
+    entry = report_cache.cached_entry('team', start_date, end_date)
+    report = entry['report'] if entry else reports.team_report(reports.load_frames(), start_date, end_date)
+    filtered_gps = data_store.date_slice(gps_df, start_date, end_date)
+    figure_builders = report_figures.team_figure_builders(report, filtered_gps)
+
+    def figure(chart_id):
+        return figure_cache.cached_figure(chart_id, start_date, end_date, figure_builders[chart_id])
+
+    # PDF export, built in the background from the report above
+    report_pdf.display_pdf_export('team', (start_date, end_date), report_pdf.team_report_pdf,
+                                  (report, data_store.frame_version('gps')),
+                                  f"team_report_{start_date:%Y%m%d}_{end_date:%Y%m%d}.pdf")
+
+    # Figures below come from figure_cache: rebuilt (by report_figures) only when
+    # the date range, the chart's widget choices or the data change
 
     # Section 1: Total Session Stats with Metric Cards
     st.header("Session Stats")
-    total_distance_card = filtered_gps['Total Distance'].sum()
-    avg_speed = filtered_gps['Metres Per Minute'].mean()
-    max_speed = filtered_gps['Maximum Speed'].max()
-    rpe = ((max_speed + avg_speed / 1000) * 0.1) + 2  # Estimate RPE
-    hsr = avg_speed  # High-Speed Running (average speed)
-
-    # Metric data for displaying in cards
-    metric_data = [
-        {"label": "Total Distance", "value": f"{total_distance_card:.2f} meters", "delta": 0},
-        {"label": "RPE", "value": f"{rpe:.2f}", "delta": 0},
-        {"label": "HSR (Avg Speed)", "value": f"{hsr:.2f} m/s", "delta": 0},
-    ]
+    metric_data = report['cards']
 
     # Apply the style to metric cards with custom colors
     style_metric_cards(
@@ -81,99 +74,91 @@ def display_team_report(start_date, end_date):
 
     # Section 2: Player-Level Data with Additional Metrics
     st.header("Player Performance Data")
-    player_data = filtered_gps.groupby('Player Name').agg({
-        'Total Distance': 'sum', 
-        'Maximum Speed': 'max',
-        'Metres Per Minute': 'mean',
-        'Explosive Distance': 'sum',
-        'Session Time(mins)': 'sum'
-    }).reset_index()
-
-    # Add new KPIs
-    player_data['% MAX TD'] = (player_data['Total Distance'] / total_distance_card) * 100
-    player_data['% MAX HSR'] = (player_data['Metres Per Minute'] / max_speed) * 100
-    player_data['% MAX SPD'] = (player_data['Maximum Speed'] / max_speed) * 100
+    player_data = report['player_data']
 
     # Display the player data table with KPIs
     st.dataframe(player_data)
 
+    # Acute:Chronic Workload Ratio per player on the last day of the range
+    st.header("Acute:Chronic Workload Ratio")
+    method = st.radio("Method", workload.METHODS, format_func=workload.METHOD_LABELS.get,
+                      horizontal=True, key="team_workload_method")
+    if report['acwr'][method].empty:
+        st.info("No workload history up to the selected end date.")
+    else:
+        profiling.plotly_chart(figure(f'acwr:{method}'), key="acwr_chart")
+
+    # Match-day cycle: average per-session load on each MD offset, from the
+    # player-day aggregate (calendar joined at load)
+    st.header("Match-Day Cycle Load Profile")
+    md_metric = st.selectbox("Metric", report_figures.MD_METRICS, index=1, key="team_md_metric")
+    fig_md = figure(f'md_profile:{md_metric}')
+    fig_md_heatmap = figure(f'md_profile_heatmap:{md_metric}')
+
+    col1, col2 = st.columns(2)
+    with col1:
+        profiling.plotly_chart(fig_md, key="md_profile_chart")
+    with col2:
+        profiling.plotly_chart(fig_md_heatmap, key="md_profile_heatmap")
+
     # Section 3: Drill-Specific Stats and Player Comparison Combined
     st.header("Drill-Specific Stats and Player Comparison")
-    drill_distribution = filtered_gps.groupby('Drill Name').agg({
-        'Total Distance': 'sum', 
-        'Metres Per Minute': 'mean',
-        'Maximum Speed': 'max'
-    }).reset_index()
 
     # Bar chart for distance covered in each drill
-    fig_drill = px.bar(drill_distribution, x='Drill Name', y='Total Distance', color='Drill Name', title="Distance Covered in Each Drill", color_discrete_sequence=["#0288D1", "#FF8A65", "#C5E1A5", "#8E24AA", "#FBC02D"])
+    fig_drill = figure('drill')
     
     # Player comparison: Total Distance vs Speed
-    fig_comparison = px.bar(player_data, x='Player Name', y=['Total Distance', 'Maximum Speed'], barmode='group', title="Player Comparison: Total Distance vs Speed")
+    fig_comparison = figure('comparison')
 
     col1, col2 = st.columns(2)
     with col1:
-        st.plotly_chart(fig_drill, key="drill_chart")
+        profiling.plotly_chart(fig_drill, key="drill_chart")
     with col2:
-        st.plotly_chart(fig_comparison, key="comparison_chart")
+        profiling.plotly_chart(fig_comparison, key="comparison_chart")
 
     # Section 4: Position & Drill Comparison (Avg Distance by Position and Drill)
     st.header("Avg Total Distance by Position & Drill")
-    position_drill_data = filtered_gps.groupby(['Position', 'Drill Name']).agg({'Total Distance': 'mean'}).reset_index()
 
     # Bar chart for avg distance by position and drill
-    fig_position_drill = px.bar(position_drill_data, x='Position', y='Total Distance', color='Drill Name', barmode='group')
-    st.plotly_chart(fig_position_drill, key="position_drill_chart")
+    fig_position_drill = figure('position_drill')
+    profiling.plotly_chart(fig_position_drill, key="position_drill_chart")
 
     # Section 5: % Game TD & HSR Comparison
     st.header("Player Performance vs Max Game (TD & HSR)")
-    game_performance = player_data[['Player Name', '% MAX TD', '% MAX HSR']]
-    fig_game_comparison = px.bar(game_performance, x='Player Name', y=['% MAX TD', '% MAX HSR'], barmode='group', title="% Game TD & HSR Comparison")
-    st.plotly_chart(fig_game_comparison, key="game_comparison_chart")
+    fig_game_comparison = figure('game_comparison')
+    profiling.plotly_chart(fig_game_comparison, key="game_comparison_chart")
 
     # Section 6: Heatmap - Player Speed vs Distance across Drills and Scatter Plot Combined
     st.header("Speed vs Distance: Heatmap & Scatter Plot")
-    drill_speed_distance = filtered_gps.groupby(['Player Name', 'Drill Name']).agg({
-        'Metres Per Minute': 'mean',
-        'Total Distance': 'sum'
-    }).reset_index()
 
-    heatmap_data = drill_speed_distance.pivot(index='Player Name', columns='Drill Name', values='Total Distance')
-    fig_heatmap = px.imshow(heatmap_data, title="Heatmap: Player's Speed and Distance Across Drills", labels=dict(x="Drill Name", y="Player Name"))
+    fig_heatmap = figure('heatmap')
 
-    fig_scatter = px.scatter(filtered_gps, x='Metres Per Minute', y='Total Distance', color='Drill Name', title="Speed vs Distance")
+    fig_scatter = figure('scatter')
 
     col1, col2 = st.columns(2)
     with col1:
-        st.plotly_chart(fig_heatmap, key="heatmap_chart")
+        profiling.plotly_chart(fig_heatmap, key="heatmap_chart")
     with col2:
-        st.plotly_chart(fig_scatter, key="scatter_chart")
+        profiling.plotly_chart(fig_scatter, key="scatter_chart")
 
     # Section 7: Donut Chart and Total Distance vs Max Speed Combined
     st.header("Total Distance vs Max Speed & Drill Distribution")
-    drill_distance = filtered_gps.groupby('Drill Name').agg({'Total Distance': 'sum'}).reset_index()
-    fig_donut = go.Figure(data=[go.Pie(labels=drill_distance['Drill Name'], values=drill_distance['Total Distance'], hole=0.4, marker=dict(colors=["#FF5722", "#FBC02D", "#0288D1"]))])
-    fig_donut.update_layout(title="Total Distance Covered by Each Drill")
+    fig_donut = figure('donut')
 
-    fig_total_vs_speed = px.scatter(player_data, x='Total Distance', y='Maximum Speed', color='Player Name', title="Total Distance vs Max Speed")
+    fig_total_vs_speed = figure('total_vs_speed')
 
     col1, col2 = st.columns(2)
     with col1:
-        st.plotly_chart(fig_donut, key="donut_chart")
+        profiling.plotly_chart(fig_donut, key="donut_chart")
     with col2:
-        st.plotly_chart(fig_total_vs_speed, key="total_vs_speed_chart")
+        profiling.plotly_chart(fig_total_vs_speed, key="total_vs_speed_chart")
 
     # Section 10: KPI Distribution per Player (Box Plot)
     st.header("KPI Distribution per Player")
-    fig_kpi_distribution = px.box(filtered_gps, x='Player Name', y='Total Distance')
-    st.plotly_chart(fig_kpi_distribution, key="kpi_distribution_chart")
+    fig_kpi_distribution = figure('kpi_distribution')
+    profiling.plotly_chart(fig_kpi_distribution, key="kpi_distribution_chart")
 
     # Section 15: Session Time vs Distance (Bubble Chart)
     st.header("Session Time vs Distance & Speed")
-    fig_bubble = px.scatter(filtered_gps, x='Total Distance', y='Metres Per Minute', size='Session Time(mins)', color='Drill Name')
-    st.plotly_chart(fig_bubble, key="bubble_chart")
-
-start_date = st.date_input("Start Date", min_value=min(gps_df['Session Date']), max_value=max(gps_df['Session Date']))
-end_date = st.date_input("End Date", min_value=min(gps_df['Session Date']), max_value=max(gps_df['Session Date']))
-
-display_team_report(start_date, end_date)
+    fig_bubble = figure('bubble')
+    profiling.plotly_chart(fig_bubble, key="bubble_chart")
@@ -0,0 +1,151 @@
+import numpy as np
+import pandas as pd
+
+# Daily loads summed per player; acute and chronic loads are built on top of them
+WORKLOAD_METRICS = ['Total Distance', 'High Speed Running', 'Explosive Distance', 'HML Distance']
+ACUTE_DAYS = 7
+CHRONIC_DAYS = 28
+
+# 'rolling': mean daily load over the last 7 / 28 calendar days on record (rest days count as zero)
+# 'ewma': exponentially weighted daily load with span 7 / 28 (alpha = 2 / (span + 1))
+METHODS = ['rolling', 'ewma']
+METHOD_LABELS = {'rolling': 'Rolling average', 'ewma': 'EWMA'}
+
+# Until a player has been on record this long the chronic load is mostly the
+# acute one, so the ratio is left empty
+MIN_ACWR_DAYS = 14
+
+WORKLOAD_KEYS = ['Player Name', 'Session Date']
+
+# Commonly used ACWR "sweet spot"; above the upper bound load is spiking
+ACWR_SWEET_SPOT = (0.8, 1.3)
+
+
+def acute_column(metric):
+    return f'{metric} Acute'
+
+
+def chronic_column(metric):
+    return f'{metric} Chronic'
+
+
+def acwr_column(metric):
+    return f'{metric} ACWR'
+
+
+# Sum of each metric per player and session day
+def daily_loads(gps_df, metrics=WORKLOAD_METRICS):
+    loads = gps_df.groupby(WORKLOAD_KEYS, observed=True)[metrics].sum().astype('float64').reset_index()
+    loads['Player Name'] = loads['Player Name'].astype(object)
+    return loads
+
+
+# One row per player per calendar day, from each player's first date to end_date.
+# Days the player has no rows for are rest days with zero load.
+def _daily_grid(loads, first_dates, first_days, end_date, metrics):
+    lengths = np.maximum((end_date - first_dates).dt.days.to_numpy() + 1, 0)
+    offsets = np.arange(lengths.sum()) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+    grid = pd.DataFrame({
+        'Player Name': first_dates.index.repeat(lengths),
+        'Session Date': first_dates.repeat(lengths).to_numpy() + pd.to_timedelta(offsets, unit='D'),
+        'Days': first_days.reindex(first_dates.index).repeat(lengths).to_numpy() + offsets,
+    })
+    grid = grid.merge(loads, on=WORKLOAD_KEYS, how='left')
+    grid[metrics] = grid[metrics].fillna(0.0)
+    return grid
+
+
+# Acute or chronic load of every row of a (Player Name, Session Date) sorted frame.
+# groupby().rolling() / .ewm() return the groups in the same order, so the
+# values line up with the frame positionally.
+def _smooth(frame, metrics, days, method):
+    grouped = frame.set_index('Session Date').groupby('Player Name', observed=True, sort=True)[metrics]
+    if method == 'rolling':
+        smoothed = grouped.rolling(f'{days}D', min_periods=1).mean()
+    elif method == 'ewma':
+        smoothed = grouped.ewm(span=days, adjust=False).mean()
+    else:
+        raise ValueError(f"Unknown workload method '{method}'")
+    return smoothed.to_numpy()
+
+
+def _sorted(df):
+    return df.sort_values(WORKLOAD_KEYS, kind='mergesort', ignore_index=True)
+
+
+# Append the days covered by new GPS rows to a workload frame.
+# Only the days from the earliest new session onwards are computed: the rolling
+# windows read the days before it from the existing frame and the EWMA
+# continues from the existing frame's last values, so the result equals a full
+# recompute. Pass workload_df=None to compute the whole history.
+def update_workload(workload_df, gps_df, method='rolling', metrics=WORKLOAD_METRICS):
+    if method not in METHODS:
+        raise ValueError(f"Unknown workload method '{method}'")
+    new_loads = daily_loads(gps_df, metrics)
+    if workload_df is None:
+        workload_df = pd.DataFrame(columns=WORKLOAD_KEYS + ['Days'] + metrics)
+    workload_df = workload_df.astype({'Player Name': object, 'Session Date': 'datetime64[ns]'})
+    if new_loads.empty:
+        return _finish(workload_df)
+
+    start = new_loads['Session Date'].min()
+    end = max(new_loads['Session Date'].max(), workload_df['Session Date'].max()) if len(workload_df) else \
+        new_loads['Session Date'].max()
+    history = workload_df[workload_df['Session Date'] < start]
+
+    # Loads already recorded from the first new day onwards get the new rows added to them
+    recorded = workload_df.loc[workload_df['Session Date'] >= start, WORKLOAD_KEYS + metrics]
+    loads = pd.concat([recorded, new_loads], ignore_index=True).groupby(WORKLOAD_KEYS)[metrics].sum().reset_index()
+
+    # Known players continue the day after their last stored day; new players start on their first session
+    last_rows = history.groupby('Player Name').tail(1).set_index('Player Name')
+    first_dates = (last_rows['Session Date'] + pd.Timedelta(days=1)).combine_first(
+        loads.groupby('Player Name')['Session Date'].min())
+    first_days = (last_rows['Days'] + 1).combine_first(pd.Series(1, index=first_dates.index))
+    grid = _daily_grid(loads, first_dates, first_days.astype('int64'), end, metrics)
+
+    first_new_day = first_dates.min()
+    for days, column in ((ACUTE_DAYS, acute_column), (CHRONIC_DAYS, chronic_column)):
+        if method == 'rolling':
+            context = history.loc[history['Session Date'] > first_new_day - pd.Timedelta(days=days),
+                                  WORKLOAD_KEYS + metrics]
+        else:
+            # adjust=False starts from the first value, so a seed row holding the last
+            # smoothed value makes the EWMA carry on exactly where it stopped
+            context = last_rows.reset_index().reindex(columns=WORKLOAD_KEYS + [column(metric) for metric in metrics])
+            context.columns = WORKLOAD_KEYS + metrics
+        frame = pd.concat([context.assign(_new=False), grid[WORKLOAD_KEYS + metrics].assign(_new=True)],
+                          ignore_index=True)
+        frame = _sorted(frame)
+        smoothed = _smooth(frame, metrics, days, method)[frame['_new'].to_numpy()]
+        grid[[column(metric) for metric in metrics]] = smoothed
+
+    return _finish(pd.concat([history, grid], ignore_index=True), metrics)
+
+
+# Sort, type and add the ratios
+def _finish(workload_df, metrics=WORKLOAD_METRICS):
+    workload_df = _sorted(workload_df)
+    workload_df['Player Name'] = workload_df['Player Name'].astype('category')
+    workload_df['Days'] = workload_df['Days'].astype('int64')
+    established = workload_df['Days'].to_numpy() >= MIN_ACWR_DAYS
+    for metric in metrics:
+        if acute_column(metric) not in workload_df:
+            continue
+        chronic = workload_df[chronic_column(metric)].to_numpy(dtype='float64')
+        with np.errstate(divide='ignore', invalid='ignore'):
+            ratio = workload_df[acute_column(metric)].to_numpy(dtype='float64') / chronic
+        workload_df[acwr_column(metric)] = np.where(established & (chronic > 0), ratio, np.nan)
+    return workload_df
+
+
+# Acute and chronic loads and ACWR per player per day, for the whole GPS history.
+# Rows are sorted by (Player Name, Session Date), like data_store's by-player frames.
+def compute_workload(gps_df, method='rolling', metrics=WORKLOAD_METRICS):
+    return update_workload(None, gps_df, method, metrics)
+
+
+# Each player's row on a given day (the latest day on record when it is later)
+def workload_on(workload_df, date):
+    day = min(pd.Timestamp(date).normalize(), workload_df['Session Date'].max())
+    return workload_df[workload_df['Session Date'] == day]